@@ -1,9 +1,10 @@
 import streamlit as st
+import asyncio
 import json
-import re
-from google import genai
-from PIL import Image
-import PyPDF2
+import time
+from app_cache import begin_rerun, cached_client, read_report, render_cache_panel, render_llm_panel
+from llm_parsing import loads_llm
+from recipe_retrieval import annotate_recipes, retrieve_recipes
 
 # --------------------------------------------------
 # PAGE CONFIG
@@ -17,17 +18,179 @@ st.set_page_config(
 # --------------------------------------------------
 # GEMINI INITIALIZATION
 # --------------------------------------------------
+begin_rerun()
+
 API_KEY = st.secrets["GEMINI_API_KEY"]
-client = genai.Client(api_key=API_KEY)
+client = cached_client(API_KEY)
 
 MODEL_ID = "gemini-3-flash-preview"  # 👈 as you requested
 
+CATALOG_MODE = "⚡ Catalog match (fast)"
+FREEFORM_MODE = "✍️ Free-form (LLM)"
+TOP_K = 5
+
+# --------------------------------------------------
+# PROMPTS
+# --------------------------------------------------
+CLINICAL_PROMPT = """
+Extract clinical data and return STRICT JSON ONLY.
+
+Format:
+{
+  "conditions": [],
+  "lab_markers": {},
+  "medications": [],
+  "summary": ""
+}
+"""
+
+INGREDIENT_PROMPT = """
+List every food ingredient visible in this image.
+Return STRICT JSON ONLY: {"ingredients": ["name", ...]}
+"""
+
+
+def build_recipe_prompt(health_context, ingredients):
+    if ingredients:
+        source = "Ingredients available:\n" + ", ".join(ingredients)
+    else:
+        source = "1. Identify ingredients in the image."
+
+    return f"""
+You are a professional medical nutritionist and chef.
+
+{source}
+2. Respect the medical profile below.
+3. Suggest 10 HEALTHY dinner recipes.
+
+Medical Profile:
+{health_context}
+
+For each recipe include:
+- Recipe name
+- Medical benefit
+- Chef tip
+"""
+
+
+# --------------------------------------------------
+# ASYNC GEMINI STAGES
+# --------------------------------------------------
+async def timed(stage, coro):
+    """Await a stage and record its wall time in session state."""
+    start = time.perf_counter()
+    try:
+        return await coro
+    finally:
+        st.session_state.timings[stage] = time.perf_counter() - start
+
+
+async def extract_clinical(content):
+    response = await client.acall(
+        [CLINICAL_PROMPT, content],
+        model=MODEL_ID,
+        stage="clinical_extraction"
+    )
+    try:
+        return loads_llm(response.text), response.text
+    except Exception:
+        return None, response.text
+
+
+async def identify_ingredients(img):
+    response = await client.acall(
+        [INGREDIENT_PROMPT, img],
+        model=MODEL_ID,
+        stage="ingredient_recognition"
+    )
+    try:
+        return loads_llm(response.text).get("ingredients", [])
+    except Exception:
+        return []
+
+
+async def run_kitchen_stages(report_content, img):
+    """Run report extraction and fridge recognition concurrently."""
+    jobs = [timed("🔍 Ingredient recognition", identify_ingredients(img))]
+    if report_content is not None:
+        jobs.append(timed("🧾 Clinical extraction", extract_clinical(report_content)))
+
+    # One failing stage must not discard the other stage's result
+    results = await asyncio.gather(*jobs, return_exceptions=True)
+    ingredients = results[0]
+    if isinstance(ingredients, Exception):
+        st.error(f"❌ Ingredient recognition failed: {ingredients}")
+        ingredients = []
+
+    clinical = results[1] if len(results) > 1 else (None, None)
+    if isinstance(clinical, Exception):
+        st.error(f"❌ Clinical extraction failed: {clinical}")
+        clinical = (None, None)
+    return ingredients, clinical
+
+
+def stream_recipes(contents):
+    """Yield recipe text chunks as Gemini produces them."""
+    start = time.perf_counter()
+    first_token = None
+    for chunk in client.stream(contents, model=MODEL_ID, stage="recipe_generation"):
+        if first_token is None:
+            first_token = time.perf_counter() - start
+            st.session_state.timings["⏱️ First recipe token"] = first_token
+        yield chunk
+    st.session_state.timings["🍽️ Recipe generation"] = time.perf_counter() - start
+
+
+def render_catalog_recipes(ingredients, clinical):
+    """Match the catalog locally, then annotate the top-k in one LLM call."""
+    start = time.perf_counter()
+    matches = retrieve_recipes(ingredients, clinical, k=TOP_K)
+    st.session_state.timings["📚 Catalog match"] = time.perf_counter() - start
+
+    if not matches:
+        st.warning("⚠️ No safe catalog recipe uses these ingredients – try Free-form mode.")
+        return
+
+    start = time.perf_counter()
+    try:
+        notes = annotate_recipes(client, MODEL_ID, matches, clinical)
+    except Exception as e:
+        notes = {}
+        st.warning(f"⚠️ Annotations unavailable: {e}")
+    st.session_state.timings["📝 Annotations"] = time.perf_counter() - start
+
+    for recipe in matches:
+        st.subheader(f"🍛 {recipe['name']}")
+        st.caption(
+            f"{recipe['course']} · {recipe['diet']} · prep {recipe['prep_time']} min · "
+            f"cook {recipe['cook_time']} min · {recipe['score']:.0%} of ingredients in your fridge"
+        )
+        if recipe["missing"]:
+            st.write("🛒 Missing: " + ", ".join(recipe["missing"]))
+        note = notes.get(recipe["name"])
+        if note:
+            st.write(f"🩺 **Medical benefit:** {note.medical_benefit}")
+            st.write(f"👩‍🍳 **Chef tip:** {note.chef_tip}")
+
+
+def show_timings():
+    timings = st.session_state.timings
+    if not timings:
+        return
+    cols = st.columns(len(timings))
+    for col, (stage, seconds) in zip(cols, timings.items()):
+        col.metric(stage, f"{seconds:.2f} s")
+
+
 # --------------------------------------------------
 # SESSION STATE
 # --------------------------------------------------
 if "clinical_data" not in st.session_state:
     st.session_state.clinical_data = None
 
+if "timings" not in st.session_state:
+    st.session_state.timings = {}
+
 # --------------------------------------------------
 # APP TITLE
 # --------------------------------------------------
@@ -35,6 +198,8 @@ st.title("🧬 Smart Health & Recipe Dashboard")
 
 tab1, tab2 = st.tabs(["📄 Medical Analyzer", "🥗 Fridge Scanner"])
 
+report_content = None
+
 # ==================================================
 # TAB 1: MEDICAL ANALYZER
 # ==================================================
@@ -47,39 +212,27 @@ with tab1:
     )
 
     if uploaded_file:
-        if uploaded_file.type == "text/plain":
-            content = uploaded_file.read().decode("utf-8")
-        else:
-            reader = PyPDF2.PdfReader(uploaded_file)
-            content = "\n".join(page.extract_text() or "" for page in reader.pages)
+        report_content = read_report(uploaded_file)
 
         if st.button("🔍 Extract Health Data"):
+            st.session_state.timings = {}
             with st.spinner("Analyzing clinical markers..."):
-                prompt = """
-Extract clinical data and return STRICT JSON ONLY.
-
-Format:
-{
-  "conditions": [],
-  "lab_markers": {},
-  "medications": [],
-  "summary": ""
-}
-"""
-
-                response = client.models.generate_content(
-                    model=MODEL_ID,
-                    contents=[prompt, content]
-                )
-
                 try:
-                    clean = re.sub(r"```json|```", "", response.text).strip()
-                    st.session_state.clinical_data = json.loads(clean)
-                    st.success("✅ Health data extracted")
-                    st.json(st.session_state.clinical_data)
-                except:
-                    st.error("❌ Invalid JSON returned")
-                    st.code(response.text)
+                    data, raw = asyncio.run(
+                        timed("🧾 Clinical extraction", extract_clinical(report_content))
+                    )
+                except Exception as e:
+                    data, raw = None, None
+                    st.error(f"❌ Clinical extraction failed: {e}")
+
+            if data is not None:
+                st.session_state.clinical_data = data
+                st.success("✅ Health data extracted")
+                st.json(st.session_state.clinical_data)
+            elif raw is not None:
+                st.error("❌ Invalid JSON returned")
+                st.code(raw)
+            show_timings()
 
 # ==================================================
 # TAB 2: FRIDGE SCANNER (FIXED & WORKING)
@@ -91,43 +244,53 @@ with tab2:
         st.info("💡 Medical profile detected – recipes optimized.")
         with st.expander("📋 Active Health Profile"):
             st.json(st.session_state.clinical_data)
+    elif report_content is not None:
+        st.info("📄 Report uploaded – it will be analyzed alongside your scan.")
     else:
         st.warning("⚠️ No medical data – using general healthy rules.")
 
     img_buffer = st.camera_input("📸 Take a picture of your ingredients")
+    mode = st.radio("Recipe source", [CATALOG_MODE, FREEFORM_MODE], horizontal=True)
 
     if img_buffer and st.button("🍽️ Generate Recipes"):
+        st.session_state.timings = {}
+
+        # 👇 PIL Image (THIS IS THE KEY FIX)
+        from PIL import Image
+        img = Image.open(img_buffer)
+
+        # Report extraction only runs here if tab 1 was skipped
+        pending_report = report_content if not st.session_state.clinical_data else None
+
         with st.spinner("Chef Gemini is analyzing your ingredients..."):
+            ingredients, (data, raw) = asyncio.run(
+                run_kitchen_stages(pending_report, img)
+            )
 
-            # 👇 PIL Image (THIS IS THE KEY FIX)
-            img = Image.open(img_buffer)
+        if data is not None:
+            st.session_state.clinical_data = data
+        elif raw is not None:
+            st.warning("⚠️ Report extraction returned invalid JSON – using general rules.")
 
+        if ingredients:
+            st.success("🥕 Detected: " + ", ".join(ingredients))
+
+        st.markdown("---")
+
+        if mode == CATALOG_MODE and ingredients:
+            render_catalog_recipes(ingredients, st.session_state.clinical_data)
+        else:
             health_context = json.dumps(
                 st.session_state.clinical_data or {},
                 indent=2
             )
+            recipe_prompt = build_recipe_prompt(health_context, ingredients)
 
-            recipe_prompt = f"""
-You are a professional medical nutritionist and chef.
+            # Fall back to the image when recognition returned nothing usable
+            contents = [recipe_prompt] if ingredients else [recipe_prompt, img]
+            st.write_stream(stream_recipes(contents))
 
-1. Identify ingredients in the image.
-2. Respect the medical profile below.
-3. Suggest 10 HEALTHY dinner recipes.
-
-Medical Profile:
-{health_context}
-
-For each recipe include:
-- Recipe name
-- Medical benefit
-- Chef tip
-"""
-
-            # ✅ THIS WORKS WITH gemini-3-flash-preview
-            response = client.models.generate_content(
-                model=MODEL_ID,
-                contents=[recipe_prompt, img]
-            )
+        show_timings()
 
-            st.markdown("---")
-            st.markdown(response.text)
+render_cache_panel()
+render_llm_panel()
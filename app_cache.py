@@ -0,0 +1,130 @@
+import hashlib
+import io
+import json
+import time
+from dataclasses import asdict
+import streamlit as st
+from llm_client import METRICS, make_client
+
+# ==================================================
+# STREAMLIT CACHES SHARED BY THE DASHBOARDS
+# ==================================================
+# Streamlit re-executes the whole script on every widget interaction.
+# Anything expensive that only depends on its inputs lives here behind
+# st.cache_resource / st.cache_data so reruns reuse the previous result.
+
+# Every cached body takes a `_call` dict (underscore args are not hashed
+# by Streamlit). The body only runs on a miss and then records its compute
+# time there, so each call, and with it each session and thread, sees only
+# its own miss.
+
+
+def file_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@st.cache_resource(show_spinner=False)
+def get_gemini_client(api_key, _call=None):
+    start = time.perf_counter()
+    client = make_client("gemini", api_key)
+    if _call is not None:
+        _call["compute"] = time.perf_counter() - start
+    return client
+
+
+@st.cache_data(show_spinner=False)
+def extract_pdf_text(digest, _data, _call=None):
+    """PDF text keyed by file hash; `_data` is excluded from Streamlit's hashing."""
+    import PyPDF2
+
+    start = time.perf_counter()
+    reader = PyPDF2.PdfReader(io.BytesIO(_data))
+    text = "\n".join(page.extract_text() or "" for page in reader.pages)
+    if _call is not None:
+        _call["compute"] = time.perf_counter() - start
+    return text
+
+
+@st.cache_resource(show_spinner=False)
+def _cost_ledger():
+    """Compute time of every cached entry, used to estimate time saved on hits."""
+    return {}
+
+
+# ==================================================
+# HIT / MISS TRACKING
+# ==================================================
+def begin_rerun():
+    st.session_state.cache_stats = []
+    st.session_state.setdefault("cache_totals", {"hits": 0, "misses": 0, "saved": 0.0})
+
+
+def track(label, key, fn, *args):
+    """Call a cached function and record whether this rerun hit the cache."""
+    call = {}
+    start = time.perf_counter()
+    result = fn(*args, _call=call)
+    elapsed = time.perf_counter() - start
+
+    ledger = _cost_ledger()
+    totals = st.session_state.cache_totals
+    if "compute" in call:
+        ledger[(label, key)] = call["compute"]
+        hit, saved = False, 0.0
+        totals["misses"] += 1
+    else:
+        hit = True
+        saved = max(ledger.get((label, key), 0.0) - elapsed, 0.0)
+        totals["hits"] += 1
+        totals["saved"] += saved
+
+    st.session_state.cache_stats.append({
+        "cache": label,
+        "status": "hit" if hit else "miss",
+        "time_ms": round(elapsed * 1000, 2),
+        "saved_ms": round(saved * 1000, 2),
+    })
+    return result
+
+
+def cached_client(api_key):
+    return track("🤖 Gemini client", "default", get_gemini_client, api_key)
+
+
+def read_report(uploaded_file):
+    """Return the text of an uploaded TXT / PDF report, cached by content hash."""
+    data = uploaded_file.getvalue()
+    if uploaded_file.type == "text/plain":
+        return data.decode("utf-8")
+    digest = file_hash(data)
+    return track("📄 PDF text", digest, extract_pdf_text, digest, data)
+
+
+def render_cache_panel():
+    stats = st.session_state.get("cache_stats", [])
+    totals = st.session_state.get("cache_totals", {"hits": 0, "misses": 0, "saved": 0.0})
+
+    with st.sidebar.expander("⚡ Cache stats", expanded=False):
+        saved_now = sum(s["saved_ms"] for s in stats)
+        st.metric("Saved this rerun", f"{saved_now:.1f} ms")
+        if stats:
+            st.dataframe(stats, hide_index=True)
+        st.caption(
+            f"Session: {totals['hits']} hits · {totals['misses']} misses · "
+            f"{totals['saved'] * 1000:.1f} ms saved"
+        )
+
+
+def render_llm_panel():
+    """Per-stage LLM latency, tokens and cost for this server process."""
+    rows = METRICS.summary()
+    with st.sidebar.expander("🤖 LLM calls", expanded=False):
+        if not rows:
+            st.caption("No LLM calls yet.")
+            return
+        st.dataframe(rows, hide_index=True)
+        st.caption(f"Estimated spend: ${sum(r['cost_usd'] for r in rows):.4f}")
+        trace = "".join(
+            json.dumps({**asdict(s), "cost_usd": s.cost_usd}) + "\n" for s in list(METRICS.spans)
+        )
+        st.download_button("⬇️ Export trace (JSONL)", trace, file_name="llm_trace.jsonl")
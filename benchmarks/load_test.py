@@ -0,0 +1,150 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import aiohttp
+from aiohttp import web
+
+from benchmarks.synthetic_data import generate_fridge_scan, generate_medical_reports
+
+# ==========================================================
+# LOAD TEST FOR recommendation_service.py
+# ==========================================================
+# Starts the service in-process on a free port (or targets --url), fires
+# requests from N concurrent workers and reports p50 / p99 latency and
+# requests/second per endpoint. /chat uses the offline LLM backend unless
+# --url points at a real deployment.
+#
+#   python -m benchmarks.load_test --requests 2000 --concurrency 50
+
+
+def build_scenarios(n_patients=50, seed=0):
+    """(method, path, payload factory) per endpoint, with synthetic bodies."""
+    rng = random.Random(seed)
+    reports = generate_medical_reports(n_patients, seed)
+    scans = [generate_fridge_scan(20, seed + i)["items"] for i in range(n_patients)]
+
+    def clinical():
+        r = rng.choice(reports)
+        return {"conditions": r["conditions"], "allergies": r["allergies"], "medications": r["medications"]}
+
+    return {
+        "health": ("GET", "/health", lambda: None),
+        "profile": ("POST", "/profile", lambda: {
+            "medical_report": clinical(), "ingredients": {"items": rng.choice(scans)},
+        }),
+        "filter": ("POST", "/ingredients/filter", lambda: {
+            "medical_report": clinical(), "ingredients": {"items": rng.choice(scans)},
+        }),
+        "recommend": ("POST", "/recipes/recommend", lambda: {
+            "clinical": clinical(), "fridge_items": rng.choice(scans), "k": 5,
+        }),
+        "plan": ("POST", "/plan", lambda: {
+            "clinical": clinical(), "fridge_items": rng.choice(scans),
+        }),
+        "substitutions": ("POST", "/substitutions", lambda: {
+            "clinical": clinical(), "blocked": [i["name"] for i in rng.sample(rng.choice(scans), 5)],
+        }),
+        "chat": ("POST", "/chat", lambda: {
+            "recipe_name": "Kheer", "question": "Can I use jaggery instead of sugar?",
+        }),
+    }
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def run_load(base_url, scenarios, total, concurrency):
+    latencies = {name: [] for name in scenarios}
+    errors = {name: 0 for name in scenarios}
+    names = list(scenarios)
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(names[i % len(names)])
+
+    async def worker(session):
+        while True:
+            try:
+                name = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            method, path, payload = scenarios[name]
+            body = payload()
+            start = time.perf_counter()
+            try:
+                async with session.request(method, base_url + path, json=body) as resp:
+                    await resp.read()
+                    if resp.status >= 400:
+                        errors[name] += 1
+            except aiohttp.ClientError:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    report = {}
+    for name, values in latencies.items():
+        values.sort()
+        report[name] = {
+            "requests": len(values),
+            "errors": errors[name],
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+        }
+    report["_total"] = {"requests": total, "seconds": round(elapsed, 3), "rps": round(total / elapsed, 1)}
+    return report
+
+
+async def main(args):
+    scenarios = build_scenarios()
+    if args.endpoints:
+        scenarios = {k: v for k, v in scenarios.items() if k in args.endpoints}
+
+    runner = None
+    base_url = args.url
+    if base_url is None:
+        os.environ.setdefault("LLM_BACKEND", "fake")
+        from recommendation_service import create_app
+
+        runner = web.AppRunner(create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        return await run_load(base_url.rstrip("/"), scenarios, args.requests, args.concurrency)
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the recommendation service")
+    parser.add_argument("--url", help="existing service URL; default starts one in-process")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--endpoints", nargs="+")
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        total = report.pop("_total")
+        print(f"{'endpoint':<12}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+        for name, r in report.items():
+            print(f"{name:<12}{r['requests']:>10}{r['errors']:>8}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+        print(f"⚡ {total['requests']} requests in {total['seconds']}s → {total['rps']} req/s")
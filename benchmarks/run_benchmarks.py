@@ -0,0 +1,340 @@
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic_data import (
+    generate_catalog,
+    generate_fridge_scan,
+    generate_llm_responses,
+    generate_medical_reports,
+    write_recipe_csv,
+)
+
+# ==========================================================
+# HOT-PATH BENCHMARKS
+# ==========================================================
+# Every stage is run twice: once plain for throughput, once under
+# tracemalloc for peak memory (tracemalloc slows allocation-heavy code).
+#
+#   python -m benchmarks.run_benchmarks --scale small
+#   python -m benchmarks.run_benchmarks --scale small --save-baseline
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name: (recipes, patients)
+SCALES = {
+    "tiny": (1_000, 1),
+    "small": (10_000, 100),
+    "medium": (100_000, 1_000),
+    "large": (1_000_000, 100_000),
+}
+
+FRIDGE_ITEMS = 40
+TOLERANCE = 0.25   # allowed slowdown / memory growth vs baseline
+REPEATS = 5        # timed runs per stage; the best one is compared
+# Stages that scan the whole catalog once per patient only get as many
+# patients as fit in this many patient × recipe pairs, so every scale
+# finishes (1M × 100k would be ~1e11 pairs, hours per run)
+MAX_PATIENT_RECIPE_PAIRS = 20_000_000
+
+
+# ==========================================================
+# STAGES
+# ==========================================================
+# Each stage takes the prepared inputs and returns a callable plus the
+# number of items it processes, so setup cost is not measured.
+
+def sample_patients(ctx):
+    """Leading medical reports, capped by MAX_PATIENT_RECIPE_PAIRS."""
+    limit = max(1, MAX_PATIENT_RECIPE_PAIRS // max(len(ctx["catalog"]), 1))
+    return ctx["reports"][:limit]
+
+
+def stage_ingest(ctx):
+    try:
+        from process_recipes import process_csv
+    except ImportError as e:
+        return None, f"skipped ({e})"
+
+    out = os.path.join(ctx["tmp"], "processed.json")
+    report = os.path.join(ctx["tmp"], "merge_report.json")
+    return (lambda: process_csv(ctx["csv"], out, report)), ctx["n_recipes"]
+
+
+def stage_item_safety(ctx):
+    from build_master_json import analyze_item_safety
+
+    items = ctx["fridge"]["items"]
+    reports = ctx["reports"]
+
+    def run():
+        for report in reports:
+            conditions = [c.lower() for c in report["conditions"]]
+            for item in items:
+                analyze_item_safety(conditions, report["allergies"], report["medications"], item)
+
+    return run, len(reports) * len(items)
+
+
+def stage_filter_ingredients(ctx):
+    from constraint_engine import filter_ingredients
+
+    master_file = os.path.join(ctx["tmp"], "master.json")
+    items = [
+        {"name": it["name"], "is_safe_for_patient": i % 3 != 0, "reason": "bench"}
+        for i, it in enumerate(ctx["fridge"]["items"])
+    ]
+    with open(master_file, "w") as f:
+        json.dump({"ingredients_profile": {"items": items}}, f)
+
+    reps = max(len(ctx["reports"]), 1)
+
+    def run():
+        for _ in range(reps):
+            filter_ingredients(master_file)
+
+    return run, reps
+
+
+def stage_recommend(ctx):
+    from diet_filt import recommend_local
+
+    catalog = ctx["catalog"]
+    reports = sample_patients(ctx)
+
+    def run():
+        for report in reports:
+            recommend_local(catalog, report["medical_profile"])
+
+    return run, len(reports) * len(catalog)
+
+
+def stage_catalog_filter(ctx):
+    from recipe_catalog import ColumnarCatalog, convert_json
+
+    json_file = os.path.join(ctx["tmp"], "catalog.json")
+    with open(json_file, "w") as f:
+        json.dump(ctx["catalog"], f)
+    convert_json(json_file, os.path.join(ctx["tmp"], "catalog"))
+    catalog = ColumnarCatalog(os.path.join(ctx["tmp"], "catalog"))
+
+    reps = 10
+
+    def run():
+        for _ in range(reps):
+            catalog.filter(course="main course", diet="vegetarian", max_prep_time=30, max_cook_time=40)
+
+    return run, reps * len(catalog)
+
+
+def stage_meal_plan(ctx):
+    from meal_planner import PlannerIndex, plan_batch
+    from nutrition import enrich_recipes
+
+    index = PlannerIndex(enrich_recipes([dict(r) for r in ctx["catalog"]]))
+    patients = [
+        {"clinical": report, "fridge_items": ctx["fridge"]["items"]}
+        for report in sample_patients(ctx)
+    ]
+
+    return (lambda: plan_batch(index, patients)), len(patients)
+
+
+def stage_substitutions(ctx):
+    from build_master_json import analyze_item_safety
+    from substitutions import SubstitutionIndex
+
+    index = SubstitutionIndex(ctx["catalog"])
+    profiles = []
+    for report in ctx["reports"]:
+        conditions = [c.lower() for c in report["conditions"]]
+        blocked = [
+            item["name"] for item in ctx["fridge"]["items"]
+            if not analyze_item_safety(conditions, report["allergies"], report["medications"], item)[0]
+        ]
+        profiles.append((blocked, conditions, report["allergies"], report["medications"]))
+
+    def run():
+        for blocked, conditions, allergies, medications in profiles:
+            index.suggest(blocked, conditions, allergies, medications)
+
+    return run, len(profiles)
+
+
+def stage_dedup(ctx):
+    from recipe_dedup import dedup_recipes
+
+    catalog = ctx["catalog"]
+    return (lambda: dedup_recipes(catalog)), len(catalog)
+
+
+def stage_llm_json(ctx):
+    from llm_parsing import loads_llm
+
+    responses = ctx["llm_responses"]
+
+    def run():
+        for text in responses:
+            loads_llm(text)
+
+    return run, len(responses)
+
+
+STAGES = {
+    "ingest": stage_ingest,
+    "item_safety": stage_item_safety,
+    "filter_ingredients": stage_filter_ingredients,
+    "recommend": stage_recommend,
+    "catalog_filter": stage_catalog_filter,
+    "meal_plan": stage_meal_plan,
+    "substitutions": stage_substitutions,
+    "dedup": stage_dedup,
+    "llm_json": stage_llm_json,
+}
+
+
+# ==========================================================
+# MEASUREMENT
+# ==========================================================
+
+def measure(fn, n_items, repeats=REPEATS):
+    """Best-of-`repeats` wall time (plus the median), then one traced run for peak memory.
+
+    The best run is the least disturbed by other load on the machine and
+    already excludes one-off costs such as lazy imports in the first run.
+    """
+    times = []
+    for _ in range(max(1, repeats)):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    elapsed = min(times)
+
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "items": n_items,
+        "repeats": len(times),
+        "seconds": round(elapsed, 4),
+        "median_seconds": round(statistics.median(times), 4),
+        "throughput": round(n_items / elapsed, 1) if elapsed else None,
+        "peak_mb": round(peak / 1e6, 3),
+    }
+
+
+def prepare(n_recipes, n_patients, tmp, seed=0):
+    csv_path = write_recipe_csv(os.path.join(tmp, "recipes.csv"), n_recipes, seed)
+    return {
+        "tmp": tmp,
+        "csv": csv_path,
+        "n_recipes": n_recipes,
+        "catalog": generate_catalog(n_recipes, seed),
+        "fridge": generate_fridge_scan(FRIDGE_ITEMS, seed),
+        "reports": generate_medical_reports(n_patients, seed),
+        "llm_responses": generate_llm_responses(max(n_patients, 100), seed),
+    }
+
+
+def run_suite(n_recipes, n_patients, stages=None, repeats=REPEATS):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        ctx = prepare(n_recipes, n_patients, tmp)
+        for name in stages or STAGES:
+            fn, n_items = STAGES[name](ctx)
+            if fn is None:
+                results[name] = {"skipped": n_items}
+                continue
+            results[name] = measure(fn, n_items, repeats)
+    return results
+
+
+# ==========================================================
+# BASELINE COMPARISON
+# ==========================================================
+
+def load_baseline(path=BASELINE_FILE):
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Return human-readable regressions against a stored baseline."""
+    regressions = []
+    for stage, current in results.items():
+        ref = baseline.get(stage)
+        if not ref or "skipped" in current or "skipped" in ref:
+            continue
+        if ref.get("throughput") and current["throughput"] < ref["throughput"] * (1 - tolerance):
+            regressions.append(
+                f"{stage}: throughput {current['throughput']:.0f}/s vs baseline {ref['throughput']:.0f}/s"
+            )
+        if ref.get("peak_mb") and current["peak_mb"] > ref["peak_mb"] * (1 + tolerance):
+            regressions.append(
+                f"{stage}: peak memory {current['peak_mb']:.1f} MB vs baseline {ref['peak_mb']:.1f} MB"
+            )
+    return regressions
+
+
+def print_table(results):
+    print(f"{'stage':<20}{'items':>12}{'best s':>10}{'median s':>10}{'items/s':>14}{'peak MB':>10}")
+    for stage, r in results.items():
+        if "skipped" in r:
+            print(f"{stage:<20}  {r['skipped']}")
+            continue
+        print(f"{stage:<20}{r['items']:>12}{r['seconds']:>10.3f}{r['median_seconds']:>10.3f}"
+              f"{r['throughput']:>14.0f}{r['peak_mb']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the recipe pipeline hot paths")
+    parser.add_argument("--scale", choices=SCALES, default="tiny")
+    parser.add_argument("--recipes", type=int, help="override the scale's recipe count")
+    parser.add_argument("--patients", type=int, help="override the scale's patient count")
+    parser.add_argument("--stages", nargs="+", choices=STAGES)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="timed runs per stage (best is kept)")
+    args = parser.parse_args()
+
+    n_recipes, n_patients = SCALES[args.scale]
+    n_recipes = args.recipes or n_recipes
+    n_patients = args.patients or n_patients
+    key = args.scale if not (args.recipes or args.patients) else f"{n_recipes}x{n_patients}"
+
+    print(f"📊 Benchmark '{key}': {n_recipes} recipes, {n_patients} patients")
+    results = run_suite(n_recipes, n_patients, args.stages, args.repeats)
+    print_table(results)
+
+    baseline = load_baseline(args.baseline)
+    if args.save_baseline:
+        baseline[key] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if key not in baseline:
+        print("ℹ️ No baseline for this scale – run with --save-baseline to record one.")
+        sys.exit(0)
+
+    regressions = compare(results, baseline[key], args.tolerance)
+    if regressions:
+        print("❌ Regressions:")
+        for r in regressions:
+            print("  -", r)
+        sys.exit(1)
+    print("✅ Within baseline tolerance")
@@ -0,0 +1,126 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# ==========================================================
+# CLI COLD-START BENCHMARK
+# ==========================================================
+# Imports each entry point in a fresh interpreter under `-X importtime`
+# and checks two things:
+#   * the module's cumulative import time stays under its budget
+#   * heavy dependencies the CLI only needs later are not imported yet
+#
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --repeat 5 --only process_recipes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["pandas", "google.genai", "pydantic", "firebase_admin", "PIL", "PyPDF2", "openai"]
+
+# label: (module, import budget in ms)
+CLIS = {
+    "process_recipes": ("process_recipes", 400),
+    "health_report_analyser": ("health_report_analyser", 100),
+    "diet_filt": ("diet_filt", 25),
+    "kitchen_chatbot": ("llm_assistant.kitchen_chatbot", 100),
+    "build_master_json": ("build_master_json", 25),
+    "constraint_engine": ("constraint_engine", 25),
+    "recipe_api": ("recipe_api", 250),
+    "llm_refinement": ("llm_refinement", 150),
+    "meal_planner": ("meal_planner", 350),
+    "expiry_index": ("expiry_index", 25),
+    "recommendation_service": ("recommendation_service", 600),
+}
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us, depth)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure_import(module, repeat=3):
+    """Best-of-`repeat` cold import of `module`: (import ms, wall ms, modules)."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+        modules = parse_importtime(proc.stderr)
+        import_ms = modules[module][1] / 1000
+        if best is None or import_ms < best[0]:
+            best = (import_ms, wall_ms, modules)
+    return best
+
+
+def check_cli(label, repeat=3):
+    module, budget_ms = CLIS[label]
+    try:
+        import_ms, wall_ms, modules = measure_import(module, repeat)
+    except RuntimeError as e:
+        return {"label": label, "error": str(e), "problems": [f"{label}: import failed ({e})"]}
+
+    heavy = [h for h in HEAVY_MODULES if h in modules]
+    slowest = sorted(
+        ((name, cum / 1000) for name, (_, cum, depth) in modules.items() if depth == 1),
+        key=lambda pair: -pair[1]
+    )[:3]
+
+    problems = []
+    if import_ms > budget_ms:
+        problems.append(f"{label}: import {import_ms:.0f} ms > budget {budget_ms} ms")
+    for h in heavy:
+        problems.append(f"{label}: imports {h} at startup")
+
+    return {
+        "label": label,
+        "import_ms": import_ms,
+        "wall_ms": wall_ms,
+        "budget_ms": budget_ms,
+        "heavy": heavy,
+        "slowest": slowest,
+        "problems": problems,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check CLI cold-start import budgets")
+    parser.add_argument("--only", nargs="+", choices=CLIS)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    _, interpreter_ms, _ = measure_import("os", args.repeat)
+    print(f"🐍 Bare interpreter start: {interpreter_ms:.0f} ms")
+    print(f"{'cli':<24}{'import ms':>10}{'budget':>8}{'wall ms':>9}  slowest direct imports")
+
+    problems = []
+    for label in args.only or CLIS:
+        r = check_cli(label, args.repeat)
+        problems.extend(r["problems"])
+        if "error" in r:
+            print(f"{label:<24}  ❌ {r['error']}")
+            continue
+        status = "✅" if not r["problems"] else "❌"
+        slowest = ", ".join(f"{name} {ms:.0f}" for name, ms in r["slowest"])
+        print(f"{label:<24}{r['import_ms']:>10.0f}{r['budget_ms']:>8}{r['wall_ms']:>9.0f}  {status} {slowest}")
+
+    if problems:
+        print("❌ Startup budget violations:")
+        for p in problems:
+            print("  -", p)
+        sys.exit(1)
+    print("✅ All CLIs within their startup budgets")
@@ -0,0 +1,181 @@
+import csv
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+# ==========================================================
+# SYNTHETIC CATALOGS, FRIDGE SCANS AND MEDICAL REPORTS
+# ==========================================================
+# Shapes mirror the real inputs: data/indian_food.csv, the "items" list
+# read by build_master_json.py and the report fields it extracts.
+
+CSV_COLUMNS = ["name", "ingredients", "diet", "prep_time", "cook_time",
+               "flavor_profile", "course", "state", "region"]
+
+SEED_CATALOG = "data/processed_recipes.json"
+
+BASE_INGREDIENTS = [
+    "rice", "milk", "sugar", "ghee", "ginger", "garlic", "tomato", "onion",
+    "coffee", "green tea", "grapefruit", "spicy chutney", "lemon juice",
+    "yogurt", "paneer", "moong dal", "urad dal", "wheat flour", "gram flour",
+    "peanuts", "cashews", "coconut", "potato", "spinach", "chicken", "egg",
+]
+
+CATEGORIES = ["vegetable", "fruit", "dairy", "meat", "pantry", "beverage", "grain", "spice"]
+COURSES = ["main course", "dessert", "snack", "starter"]
+DIETS = ["vegetarian", "non vegetarian"]
+FLAVORS = ["sweet", "spicy", "bitter", "sour"]
+
+CONDITIONS = ["anxiety", "gerd", "diabetes", "hypertension", "renal"]
+ALLERGIES = ["peanut", "milk", "egg", "cashew", "wheat"]
+MEDICATIONS = ["Lorazepam", "Omeprazole", "Atorvastatin (statin)", "Metformin", "Benzodiazepine"]
+
+
+def ingredient_vocab(size=2000, seed_catalog=SEED_CATALOG):
+    """Real catalog ingredients first, padded with synthetic names."""
+    vocab = list(BASE_INGREDIENTS)
+    if os.path.exists(seed_catalog):
+        with open(seed_catalog) as f:
+            for recipe in json.load(f):
+                vocab.extend(i.strip().lower() for i in recipe["ingredients"])
+    vocab = list(dict.fromkeys(vocab))
+    vocab.extend(f"ingredient {i}" for i in range(max(size - len(vocab), 0)))
+    return vocab[:max(size, len(BASE_INGREDIENTS))]
+
+
+def generate_recipe_rows(n_recipes, seed=0, vocab=None):
+    rng = random.Random(seed)
+    vocab = vocab or ingredient_vocab()
+    # Zipf-like skew: common staples appear far more often than rare items
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+
+    for i in range(n_recipes):
+        k = rng.randint(3, 10)
+        ingredients = list(dict.fromkeys(rng.choices(vocab, weights=weights, k=k)))
+        yield {
+            "name": f"Recipe {i}",
+            "ingredients": ", ".join(ingredients),
+            "diet": rng.choice(DIETS),
+            "prep_time": rng.choice([-1, 5, 10, 15, 20, 30, 45, 60, 120]),
+            "cook_time": rng.choice([-1, 10, 20, 30, 40, 60, 90]),
+            "flavor_profile": rng.choice(FLAVORS),
+            "course": rng.choice(COURSES),
+            "state": "-1",
+            "region": "-1",
+        }
+
+
+def write_recipe_csv(path, n_recipes, seed=0):
+    """Stream n_recipes rows to a CSV with the indian_food.csv columns."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        for row in generate_recipe_rows(n_recipes, seed):
+            writer.writerow(row)
+    return path
+
+
+def generate_catalog(n_recipes, seed=0):
+    """In-memory processed recipes (process_recipes.py output shape)."""
+    rng = random.Random(seed + 1)
+    recipes = []
+    for row in generate_recipe_rows(n_recipes, seed):
+        recipes.append({
+            "name": row["name"],
+            "cuisine": "Indian",
+            "ingredients": row["ingredients"].split(", "),
+            "course": row["course"],
+            "diet": row["diet"],
+            "prep_time": row["prep_time"],
+            "cook_time": row["cook_time"],
+            "dietary_profile": {
+                "diabetic_safe": rng.random() < 0.6,
+                "renal_safe": rng.random() < 0.7,
+            },
+        })
+    return recipes
+
+
+def generate_fridge_scan(n_items, seed=0, today=None):
+    rng = random.Random(seed)
+    today = today or datetime.now()
+    vocab = ingredient_vocab(size=max(n_items, len(BASE_INGREDIENTS)))
+
+    items = []
+    for name in rng.sample(vocab, min(n_items, len(vocab))):
+        expiry = today + timedelta(days=rng.randint(-5, 30))
+        items.append({
+            "name": name,
+            "category": rng.choice(CATEGORIES),
+            "quantity": f"{rng.randint(1, 5)} units",
+            "expiry_date": expiry.strftime("%Y-%m-%d"),
+            "dietary_classification": rng.choice(["veg", "non-veg", "vegan"]),
+        })
+    return {"items": items}
+
+
+def generate_medical_reports(n_patients, seed=0):
+    """Reports with the fields build_master_json and diet_filt consume."""
+    rng = random.Random(seed)
+    reports = []
+    for i in range(n_patients):
+        conditions = rng.sample(CONDITIONS, rng.randint(0, 3))
+        allergies = rng.sample(ALLERGIES, rng.randint(0, 2))
+        reports.append({
+            "patient_profile": {"name": f"Patient {i}", "patient_id": str(100000 + i)},
+            "conditions": conditions,
+            "allergies": allergies,
+            "medications": rng.sample(MEDICATIONS, rng.randint(0, 2)),
+            "medical_profile": {
+                "diabetes": {"status": "YES" if "diabetes" in conditions else "NO"},
+                "renal_condition": {"status": "YES" if "renal" in conditions else "NO"},
+                "allergies": allergies,
+            },
+        })
+    return reports
+
+
+def generate_llm_responses(n, seed=0):
+    """JSON strings shaped like the dashboard's clinical extraction.
+
+    Most are fenced; about one in ten has a trailing comma and one in ten
+    is cut off mid-value, like a response that hit max_output_tokens.
+    """
+    rng = random.Random(seed)
+    responses = []
+    for report in generate_medical_reports(n, seed):
+        body = json.dumps({
+            "conditions": report["conditions"],
+            "lab_markers": {"hba1c": round(rng.uniform(4.5, 9.0), 1)},
+            "medications": report["medications"],
+            "summary": "Synthetic extraction",
+        }, indent=2)
+        roll = rng.random()
+        if roll < 0.1:
+            body = body.replace("\n}", ",\n}")
+        elif roll < 0.2:
+            body = body[:rng.randint(len(body) // 2, len(body) - 2)]
+        responses.append(f"```json\n{body}\n```" if rng.random() < 0.7 else body)
+    return responses
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Write synthetic benchmark inputs")
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--patients", type=int, default=10)
+    parser.add_argument("--fridge-items", type=int, default=40)
+    parser.add_argument("--out", default="bench_data")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    write_recipe_csv(os.path.join(args.out, "recipes.csv"), args.recipes, args.seed)
+    with open(os.path.join(args.out, "fridge_scan.json"), "w") as f:
+        json.dump(generate_fridge_scan(args.fridge_items, args.seed), f, indent=2)
+    with open(os.path.join(args.out, "medical_reports.json"), "w") as f:
+        json.dump(generate_medical_reports(args.patients, args.seed), f, indent=2)
+
+    print(f"✅ Synthetic data written to {args.out}/")
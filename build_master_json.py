@@ -1,10 +1,62 @@
 import json
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 
 # ==========================================================
 # RULE ENGINE HELPERS
 # ==========================================================
 
+# An allergy to one of these nutrition reference foods rules out the whole
+# family, which a plain substring test cannot see ("milk" allergy vs.
+# "paneer" or "ghee")
+ALLERGEN_FAMILIES = {
+    "milk": {"milk", "condensed milk", "milk solids", "cream", "yogurt", "paneer", "butter", "ghee"},
+    "egg": {"egg"},
+    "nut": {"nut"},
+    "seafood": {"seafood"},
+    "wheat flour": {"wheat flour", "semolina", "bread"},
+}
+
+# Allergy words that name a family without resolving to its reference food
+# ("shellfish", "dairy"). Items containing one of these words are blocked
+# along with the family even if nutrition cannot resolve them ("crab").
+ALLERGY_TERMS = {
+    "shellfish": "seafood", "shrimp": "seafood", "crab": "seafood", "prawn": "seafood",
+    "lobster": "seafood", "fish": "seafood", "seafood": "seafood",
+    "dairy": "milk", "lactose": "milk",
+    "gluten": "wheat flour", "wheat": "wheat flour",
+    "peanut": "nut", "nut": "nut",
+}
+
+
+# nutrition / recipe_retrieval are imported lazily: they are much heavier
+# than this module and recipe_retrieval imports it
+@lru_cache(maxsize=1024)
+def allergy_family(allergy):
+    """ALLERGEN_FAMILIES key an allergy refers to, or None."""
+    from nutrition import resolve_food
+    from recipe_retrieval import canonical_ingredient
+
+    canon = canonical_ingredient(allergy)
+    food = resolve_food(canon)
+    if food in ALLERGEN_FAMILIES:
+        return food
+    return next((ALLERGY_TERMS[w] for w in canon.split() if w in ALLERGY_TERMS), None)
+
+
+@lru_cache(maxsize=1 << 16)
+def item_families(name):
+    """Allergen families an item belongs to, by reference food or by word."""
+    from nutrition import resolve_food
+    from recipe_retrieval import canonical_ingredient
+
+    canon = canonical_ingredient(name)
+    food = resolve_food(canon)
+    families = {f for f, foods in ALLERGEN_FAMILIES.items() if food in foods}
+    families.update(ALLERGY_TERMS[w] for w in canon.split() if w in ALLERGY_TERMS)
+    return frozenset(families)
+
+
 def analyze_item_safety(conditions, allergies, medications, item):
     name = item["name"].lower()
     reason_list = []
@@ -24,6 +76,11 @@ def analyze_item_safety(conditions, allergies, medications, item):
         if allergy.lower() in name:
             safe = False
             reason_list.append(f"Allergy match: {allergy}")
+        else:
+            family = allergy_family(allergy)
+            if family and family in item_families(name):
+                safe = False
+                reason_list.append(f"Allergy match: {allergy} ({family} family)")
 
     # --- Medication Interaction Rules ---
     for med in medications:
@@ -44,26 +101,44 @@ def analyze_item_safety(conditions, allergies, medications, item):
     return safe, reason
 
 
-def expiry_status(expiry_date_str):
+@lru_cache(maxsize=4096)
+def _parse_date(expiry_date_str):
+    # strptime also accepts unpadded dates such as "2026-1-5"
+    return datetime.strptime(expiry_date_str, "%Y-%m-%d").date()
+
+
+def days_until(expiry_date_str, today):
+    """Whole days from `today` (a date) to a YYYY-MM-DD date; None if missing/invalid."""
+    if not expiry_date_str:
+        return None
+    try:
+        return (_parse_date(str(expiry_date_str)) - today).days
+    except ValueError:
+        return None
+
+
+def expiry_status(expiry_date_str, today=None):
     """Check expiry status & urgency labels"""
     if not expiry_date_str:
         return "unknown"
 
-    try:
-        exp = datetime.strptime(expiry_date_str, "%Y-%m-%d")
-        days = (exp - datetime.now()).days
-
-        if days < 0:
-            return f"expired ({abs(days)} days ago)"
-        elif days <= 3:
-            return "expiring soon"
-        elif days <= 7:
-            return "use this week"
-        else:
-            return "fresh"
-    except:
+    days = days_until(expiry_date_str, today or date.today())
+    if days is None:
         return "invalid date"
 
+    if days < 0:
+        return f"expired ({abs(days)} days ago)"
+    elif days <= 3:
+        return "expiring soon"
+    elif days <= 7:
+        return "use this week"
+    else:
+        return "fresh"
+
+
+def needs_expiry_alert(expiry_state):
+    return expiry_state.startswith("expired") or expiry_state == "expiring soon"
+
 
 def daily_meal_recommendations(conditions, ingredients):
     recs = []
@@ -89,100 +164,124 @@ def daily_meal_recommendations(conditions, ingredients):
 # MAIN PIPELINE
 # ==========================================================
 
-# ----- Load Inputs -----
-with open("medical_report.json") as f:
-    medical_data = json.load(f)
+def build_master_data(medical_data, ingredients_data, today=None):
+    """Build the master dict from already-loaded inputs (no file IO)."""
+    # One reference day for every expiry check in this run
+    today = today or date.today()
+
+    # ----- Extract Fields -----
+    conditions = [c.lower() for c in medical_data.get("conditions", [])]
+    allergies = medical_data.get("allergies", [])
+    medications = medical_data.get("medications", [])
+
+    # ==========================================================
+    # Build MASTER JSON
+    # ==========================================================
+
+    master = {
+        "patient_profile": medical_data.get("patient_profile", {}),
+        "medical_report": medical_data,
+
+        "ingredients_profile": {
+            "last_updated": today.strftime("%Y-%m-%d"),
+            "items": []
+        },
+
+        "compatibility_summary": {
+            "safe_items": [],
+            "risky_items": [],
+            "avoid_items": [],
+            "expiry_alerts": [],
+            "medication_interaction_warnings": [],
+            "notes": "Generated based on conditions + allergies + medications + food rules."
+        },
+
+        "nutrition_coach": {
+            "daily_meal_recommendations": [],
+            "foods_to_avoid_today": [],
+            "safe_substitutes": []
+        }
+    }
 
-with open("ingredients.json") as f:
-    ingredients_data = json.load(f)
 
-# ----- Extract Fields -----
-conditions = [c.lower() for c in medical_data.get("conditions", [])]
-allergies = medical_data.get("allergies", [])
-medications = medical_data.get("medications", [])
+    # ----- Process Ingredients -----
+    for item in ingredients_data.get("items", []):
+        safe, reason = analyze_item_safety(conditions, allergies, medications, item)
 
-# ==========================================================
-# Build MASTER JSON
-# ==========================================================
+        expiry_state = expiry_status(item.get("expiry_date", ""), today)
 
-master = {
-    "patient_profile": medical_data.get("patient_profile", {}),
-    "medical_report": medical_data,
-    
-    "ingredients_profile": {
-        "last_updated": datetime.now().strftime("%Y-%m-%d"),
-        "items": []
-    },
-
-    "compatibility_summary": {
-        "safe_items": [],
-        "risky_items": [],
-        "avoid_items": [],
-        "expiry_alerts": [],
-        "medication_interaction_warnings": [],
-        "notes": "Generated based on conditions + allergies + medications + food rules."
-    },
-
-    "nutrition_coach": {
-        "daily_meal_recommendations": [],
-        "foods_to_avoid_today": [],
-        "safe_substitutes": []
-    }
-}
+        item_record = {
+            "name": item["name"],
+            "category": item.get("category", ""),
+            "quantity": item.get("quantity", ""),
+            "expiry_date": item.get("expiry_date", ""),
+            "expiry_status": expiry_state,
+            "dietary_classification": item.get("dietary_classification", ""),
+            "is_safe_for_patient": safe,
+            "reason": reason
+        }
 
+        master["ingredients_profile"]["items"].append(item_record)
 
-# ----- Process Ingredients -----
-for item in ingredients_data.get("items", []):
-    safe, reason = analyze_item_safety(conditions, allergies, medications, item)
-    
-    expiry_state = expiry_status(item.get("expiry_date", ""))
-
-    item_record = {
-        "name": item["name"],
-        "category": item.get("category", ""),
-        "quantity": item.get("quantity", ""),
-        "expiry_date": item.get("expiry_date", ""),
-        "expiry_status": expiry_state,
-        "dietary_classification": item.get("dietary_classification", ""),
-        "is_safe_for_patient": safe,
-        "reason": reason
-    }
+        # Classification summary
+        if safe:
+            master["compatibility_summary"]["safe_items"].append(item["name"])
+        elif "allergy" in reason.lower():
+            master["compatibility_summary"]["avoid_items"].append(item["name"])
+        else:
+            master["compatibility_summary"]["risky_items"].append(item["name"])
 
-    master["ingredients_profile"]["items"].append(item_record)
+        # Expiry alerts
+        if needs_expiry_alert(expiry_state):
+            master["compatibility_summary"]["expiry_alerts"].append(f"{item['name']} - {expiry_state}")
 
-    # Classification summary
-    if safe:
-        master["compatibility_summary"]["safe_items"].append(item["name"])
-    elif "allergy" in reason.lower():
-        master["compatibility_summary"]["avoid_items"].append(item["name"])
-    else:
-        master["compatibility_summary"]["risky_items"].append(item["name"])
+        # Medication warnings
+        if "⚠" in reason:
+            master["compatibility_summary"]["medication_interaction_warnings"].append(
+                f"{item['name']} - {reason}"
+            )
+
+
+    # ----- Add Meal Recommendations -----
+    master["nutrition_coach"]["daily_meal_recommendations"] = daily_meal_recommendations(conditions, master["ingredients_profile"]["items"])
+
+    # Foods to avoid
+    master["nutrition_coach"]["foods_to_avoid_today"] = master["compatibility_summary"]["risky_items"] + master["compatibility_summary"]["avoid_items"]
+
+    # Safe substitutes: nearest safe catalog ingredients for everything flagged
+    # (imported here because substitutions builds on this module's rules)
+    blocked = master["nutrition_coach"]["foods_to_avoid_today"]
+    if blocked:
+        from substitutions import get_index, substitute_notes
+
+        suggestions = get_index().suggest(blocked, conditions, allergies, medications)
+        master["nutrition_coach"]["safe_substitutes"] = substitute_notes(suggestions)
+
+
+    return master
 
-    # Expiry alerts
-    if expiry_state in ["expired", "expiring soon"]:
-        master["compatibility_summary"]["expiry_alerts"].append(f"{item['name']} - {expiry_state}")
 
-    # Medication warnings
-    if "⚠" in reason:
-        master["compatibility_summary"]["medication_interaction_warnings"].append(
-            f"{item['name']} - {reason}"
-        )
+def build_master(medical_file="medical_report.json",
+                 ingredients_file="ingredients.json",
+                 output_file="master_health_ingredients.json"):
+    # ----- Load Inputs -----
+    with open(medical_file) as f:
+        medical_data = json.load(f)
 
+    with open(ingredients_file) as f:
+        ingredients_data = json.load(f)
 
-# ----- Add Meal Recommendations -----
-master["nutrition_coach"]["daily_meal_recommendations"] = daily_meal_recommendations(conditions, master["ingredients_profile"]["items"])
+    master = build_master_data(medical_data, ingredients_data)
 
-# Foods to avoid
-master["nutrition_coach"]["foods_to_avoid_today"] = master["compatibility_summary"]["risky_items"] + master["compatibility_summary"]["avoid_items"]
+    # ----- Save Output -----
+    with open(output_file, "w") as f:
+        json.dump(master, f, indent=4)
 
-# Safe substitutes (basic)
-if "milk" in str(master["compatibility_summary"]["avoid_items"]).lower():
-    master["nutrition_coach"]["safe_substitutes"].append("Try almond milk or lactose-free milk")
+    print("\n🎉 MASTER JSON CREATED SUCCESSFULLY!")
+    print(f"📌 Saved as: {output_file}")
 
+    return master
 
-# ----- Save Output -----
-with open("master_health_ingredients.json", "w") as f:
-    json.dump(master, f, indent=4)
 
-print("\n🎉 MASTER JSON CREATED SUCCESSFULLY!")
-print("📌 Saved as: master_health_ingredients.json")
+if __name__ == "__main__":
+    build_master()
@@ -1,16 +1,14 @@
 import json
 
-def load_master():
-    with open("master_health_ingredients.json") as f:
+def load_master(master_file="master_health_ingredients.json"):
+    with open(master_file) as f:
         return json.load(f)
 
-def filter_ingredients():
-    data = load_master()
-    
+def split_items(items):
     safe = []
     unsafe = []
 
-    for item in data["ingredients_profile"]["items"]:
+    for item in items:
         if item["is_safe_for_patient"]:
             safe.append(item["name"])
         else:
@@ -18,6 +16,10 @@ def filter_ingredients():
 
     return safe, unsafe
 
+def filter_ingredients(master_file="master_health_ingredients.json"):
+    data = load_master(master_file)
+    return split_items(data["ingredients_profile"]["items"])
+
 if __name__ == "__main__":
     safe, unsafe = filter_ingredients()
     print("🛡 SAFE INGREDIENTS:", safe)
@@ -1,24 +1,52 @@
 import json
-import firebase_admin
-from firebase_admin import credentials, firestore
 
-cred = credentials.Certificate("serviceAccountKey.json")
-try:
-    firebase_admin.initialize_app(cred)
-except:
-    pass
+_db = None
 
-db = firestore.client()
+
+def get_db():
+    global _db
+    if _db is None:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        cred = credentials.Certificate("serviceAccountKey.json")
+        try:
+            firebase_admin.initialize_app(cred)
+        except:
+            pass
+        _db = firestore.client()
+    return _db
 
 def load_patient_profile():
     with open("master_health_ingredients.json") as f:
         return json.load(f)
 
+def matches_patient(recipe, patient):
+    """Local mirror of the Firestore filter rules in recommend_recipes()."""
+    profile = recipe.get("dietary_profile", {})
+
+    if patient["diabetes"]["status"] == "YES" and not profile.get("diabetic_safe"):
+        return False
+
+    if patient["renal_condition"]["status"] == "YES" and not profile.get("renal_safe"):
+        return False
+
+    ingredients = recipe.get("ingredients", [])
+    for allergy in patient["allergies"]:
+        if allergy in ingredients:
+            return False
+
+    return True
+
+def recommend_local(recipes, patient):
+    """Same recommendation as recommend_recipes() over an in-memory catalog."""
+    return [r["name"] for r in recipes if matches_patient(r, patient)]
+
 def recommend_recipes():
     data = load_patient_profile()
     patient = data["medical_profile"]
 
-    query = db.collection("recipes")
+    query = get_db().collection("recipes")
 
     # FILTER RULES
     if patient["diabetes"]["status"] == "YES":
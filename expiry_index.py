@@ -0,0 +1,171 @@
+import heapq
+from collections import defaultdict
+from datetime import datetime
+from build_master_json import days_until, expiry_status
+from recipe_retrieval import canonical_ingredient
+
+# ==========================================================
+# EXPIRY-AWARE PRIORITY INDEX
+# ==========================================================
+# One reference day per run; every item's days-to-expiry is computed once
+# and kept in a min-heap, so "what expires next" is the top of the heap.
+# Recipes are ranked through an ingredient → recipes inverted index, so
+# only recipes that actually use an urgent item are ever touched.
+#
+#   fridge = ExpiryIndex(items)
+#   recipes = RecipeIngredientIndex(catalog)
+#   fridge.what_to_cook(recipes, k=5)
+
+SOON_DAYS = 3      # same cut-off as build_master_json.expiry_status "expiring soon"
+
+
+def reference_day(now=None):
+    """The single 'today' every expiry computation in a run should share."""
+    now = now or datetime.now()
+    return now.date() if isinstance(now, datetime) else now
+
+
+# ==========================================================
+# RECIPE SIDE
+# ==========================================================
+
+class RecipeIngredientIndex:
+    """Inverted index: canonical ingredient → catalog row ids."""
+
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.by_ingredient = defaultdict(list)
+        self.canonical = []
+        for row, recipe in enumerate(recipes):
+            canons = {canonical_ingredient(i) for i in recipe.get("ingredients", [])} - {""}
+            self.canonical.append(canons)
+            for canon in canons:
+                self.by_ingredient[canon].append(row)
+
+    def recipes_using(self, ingredient):
+        return self.by_ingredient.get(canonical_ingredient(ingredient), [])
+
+
+# ==========================================================
+# FRIDGE SIDE
+# ==========================================================
+
+class ExpiryIndex:
+    def __init__(self, items, today=None):
+        self.today = reference_day(today)
+        self.expired = []
+        self.undated = []
+        self._heap = []
+
+        for seq, item in enumerate(items):
+            days = days_until(item.get("expiry_date"), self.today)
+            if days is None:
+                self.undated.append(item)
+            elif days < 0:
+                self.expired.append((days, item))
+            else:
+                self._heap.append((days, seq, item))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._heap)
+
+    def peek(self):
+        """(days_left, item) of the next item to expire, or None."""
+        if not self._heap:
+            return None
+        days, _, item = self._heap[0]
+        return days, item
+
+    def soonest(self, n):
+        return [(days, item) for days, _, item in heapq.nsmallest(n, self._heap)]
+
+    def within(self, horizon):
+        """Items expiring within `horizon` days, soonest first.
+
+        Walks the heap top-down and prunes every subtree whose root is
+        past the horizon, so the cost depends on the urgent items only.
+        """
+        out, stack = [], [0] if self._heap else []
+        while stack:
+            i = stack.pop()
+            days, _, item = self._heap[i]
+            if days > horizon:
+                continue
+            out.append((days, item))
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(self._heap):
+                    stack.append(child)
+        out.sort(key=lambda pair: pair[0])
+        return out
+
+    def pop(self):
+        """Remove and return the next item to expire (e.g. once it is used)."""
+        days, _, item = heapq.heappop(self._heap)
+        return days, item
+
+    def labels(self):
+        """{item name: expiry_status label} using the shared reference day."""
+        items = [item for _, _, item in self._heap] + [item for _, item in self.expired] + self.undated
+        return {item["name"]: expiry_status(item.get("expiry_date"), self.today) for item in items}
+
+    def alerts(self):
+        """Expired and expiring-soon items, most urgent first."""
+        expired = sorted(self.expired, key=lambda pair: pair[0])
+        return [item for _, item in expired] + [item for _, item in self.within(SOON_DAYS)]
+
+    def what_to_cook(self, recipe_index, k=5, horizon=SOON_DAYS, is_unsafe=None):
+        """Top-k recipes by how many soon-to-expire items they consume.
+
+        Each urgent item contributes 1 / (1 + days_left), so an item
+        expiring today outweighs one expiring in three days. With
+        `is_unsafe` (canonical ingredient -> bool, e.g.
+        recipe_retrieval.unsafe_checker) unsafe items are not cooked with
+        and recipes containing any unsafe ingredient are skipped.
+        """
+        scores = defaultdict(float)
+        uses = defaultdict(list)
+        for days, item in self.within(horizon):
+            if is_unsafe and is_unsafe(canonical_ingredient(item["name"])):
+                continue
+            weight = 1.0 / (1.0 + days)
+            for row in recipe_index.recipes_using(item["name"]):
+                scores[row] += weight
+                uses[row].append(item["name"])
+
+        if is_unsafe:
+            scores = {
+                row: score for row, score in scores.items()
+                if not any(is_unsafe(c) for c in recipe_index.canonical[row])
+            }
+
+        best = heapq.nlargest(k, scores.items(), key=lambda kv: (kv[1], len(uses[kv[0]])))
+        return [
+            {
+                "name": recipe_index.recipes[row]["name"],
+                "score": round(score, 3),
+                "uses_expiring": uses[row],
+            }
+            for row, score in best
+        ]
+
+
+if __name__ == "__main__":
+    import json
+    from datetime import timedelta
+
+    today = reference_day()
+    fridge = ExpiryIndex([
+        {"name": "Milk", "expiry_date": str(today)},
+        {"name": "Tomatoes", "expiry_date": str(today + timedelta(days=2))},
+        {"name": "Potatoes", "expiry_date": str(today + timedelta(days=10))},
+        {"name": "Paneer", "expiry_date": str(today - timedelta(days=1))},
+    ], today)
+
+    with open("data/processed_recipes.json") as f:
+        recipes = RecipeIngredientIndex(json.load(f))
+
+    print("⏳ Next to expire:", fridge.peek())
+    print("🏷️", fridge.labels())
+    for r in fridge.what_to_cook(recipes):
+        print(f"🍳 {r['name']} ({r['score']}) uses {', '.join(r['uses_expiring'])}")
@@ -1,37 +1,23 @@
-from google import genai
-from google.genai.errors import ClientError
 import os
 import json
 import time
-from typing import List, Optional
-from pydantic import BaseModel, Field
-import enum
 from datetime import datetime
-from config import Config
+from llm_client import LLMError, client_from_config
+from llm_parsing import LLMParseError, loads_llm
 
 # ================= CONFIG =================
-config = Config('.config')
-API_KEY = config.api_key
 MODEL_NAME = "gemini-3-flash-preview"
 OUTPUT_FILE = "medical_report.json"
 
-client = genai.Client(api_key=API_KEY)
-
-# ================= UNIVERSAL SCHEMA MODEL =================
-class UniversalHealthReport(BaseModel):
-    source_metadata: dict = Field(default_factory=dict)
-    patient_profile: dict = Field(default_factory=dict)
-    encounter_info: dict = Field(default_factory=dict)
-    symptoms: list = Field(default_factory=list)
-    diagnoses: dict = Field(default_factory=dict)
-    allergies: dict = Field(default_factory=dict)
-    medications_current: list = Field(default_factory=list)
-    lab_results: list = Field(default_factory=list)
-    findings: dict = Field(default_factory=dict)
-    lifestyle_and_risk: dict = Field(default_factory=dict)
-    recommendations: dict = Field(default_factory=dict)
-    system_generated: dict = Field(default_factory=dict)
-    last_updated: str = Field(default_factory=lambda: datetime.now().isoformat())
+_client = None
+
+
+def get_client():
+    # Built on first call: reads .config and imports the provider SDK
+    global _client
+    if _client is None:
+        _client = client_from_config('.config')
+    return _client
 
 
 # ================= PROMPT =================
@@ -110,13 +96,14 @@ Now EXTRACT JSON only:
 # ================= GEMINI CALL =================
 def call_gemini(prompt: str, content: str):
     try:
-        return client.models.generate_content(
+        return get_client().call(
+            [prompt, content],
             model=MODEL_NAME,
-            contents=[prompt, content],
-            config={"temperature": 0.1}
+            config={"temperature": 0.1},
+            stage="report_extraction"
         )
-    except ClientError as e:
-        if "RESOURCE_EXHAUSTED" in str(e):
+    except LLMError as e:
+        if e.quota_exceeded:
             return {"error": "❌ API QUOTA EXCEEDED — enable billing or retry later"}
         raise e
 
@@ -142,18 +129,23 @@ def parse_document(file_path: str) -> dict:
     response = call_gemini(UNIVERSAL_PROMPT, content)
     if response is None:
         return {"error": "❌ No response from API"}
+    if isinstance(response, dict):
+        return response
 
     raw = response.text.strip()
 
+    # decode (fences / trailing commas / truncation are repaired locally)
+    try:
+        data = loads_llm(raw)
+    except LLMParseError:
+        return {"error": "❌ Model returned invalid JSON", "raw_output": raw}
+
     # validate
+    from llm_schemas import UniversalHealthReport
     try:
-        report = UniversalHealthReport.model_validate_json(raw).model_dump()
-    except Exception as e:
-        # Fallback: try raw load to give debug output
-        try:
-            report = json.loads(raw)
-        except:
-            return {"error": "❌ Model returned invalid JSON", "raw_output": raw}
+        report = UniversalHealthReport.model_validate(data).model_dump()
+    except ValueError as e:
+        return {"error": f"❌ Report does not match schema: {e}", "raw_output": raw}
 
     # inject metadata
     report["source_metadata"]["input_type"] = input_type
@@ -1,23 +1,43 @@
 import os
-import firebase_admin
-from firebase_admin import credentials, firestore
-from openai import OpenAI
+import sys
+
+# llm_client.py lives at the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_client import make_client
+
+CHAT_MODEL = "gpt-4.1-mini"  # or gpt-5 if available
 
 # ================================
 # 🔥 FIREBASE INITIALIZATION
 # ================================
-cred = credentials.Certificate("serviceAccountKey.json")
-try:
-    firebase_admin.initialize_app(cred)
-except Exception:
-    pass  # Ignore if already initialized
+_db = None
+
 
-db = firestore.client()
+def get_db():
+    global _db
+    if _db is None:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        cred = credentials.Certificate("serviceAccountKey.json")
+        try:
+            firebase_admin.initialize_app(cred)
+        except Exception:
+            pass  # Ignore if already initialized
+        _db = firestore.client()
+    return _db
 
 # ================================
 # ⚙️ OPENAI CLIENT INITIALIZATION
 # ================================
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = make_client("openai", os.getenv("OPENAI_API_KEY"))
+    return _client
 
 # ================================
 # 🔄 UNIT CONVERSION HELPERS
@@ -57,7 +77,7 @@ def get_recipe_from_firebase(recipe_name):
             ingredients: ["paneer", "onion", "tomato", "ghee"]
             instructions: "Fry onions, add tomatoes..."
     """
-    doc_ref = db.collection("recipes").where("name", "==", recipe_name).limit(1).stream()
+    doc_ref = get_db().collection("recipes").where("name", "==", recipe_name).limit(1).stream()
     for doc in doc_ref:
         return doc.to_dict()
     return None
@@ -66,12 +86,7 @@ def get_recipe_from_firebase(recipe_name):
 # ================================
 # 🤖 CHATBOT ANSWER ENGINE
 # ================================
-def answer_query(recipe_name, user_question):
-    recipe = get_recipe_from_firebase(recipe_name)
-
-    if not recipe:
-        return f"⚠️ Recipe '{recipe_name}' not found in database."
-
+def build_system_prompt(recipe_name, recipe):
     ingredients = ", ".join(recipe.get("ingredients", []))
     instructions = recipe.get("instructions", "No instructions found.")
 
@@ -87,17 +102,29 @@ Your tasks:
 - DO NOT hallucinate ingredients that are not listed
 - If unsure, say: "I am not sure, please verify manually."
 """
+    return system_prompt
+
 
-    response = client.chat.completions.create(
-        model="gpt-4.1-mini",  # or gpt-5 if available
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_question}
-        ],
-        temperature=0.4
+def answer_with_recipe(recipe_name, recipe, user_question, client=None):
+    """Answer a question about an already-fetched recipe."""
+    response = (client or get_client()).call(
+        [user_question],
+        model=CHAT_MODEL,
+        system=build_system_prompt(recipe_name, recipe),
+        config={"temperature": 0.4},
+        stage="chatbot"
     )
 
-    return response.choices[0].message.content.strip()
+    return response.text.strip()
+
+
+def answer_query(recipe_name, user_question):
+    recipe = get_recipe_from_firebase(recipe_name)
+
+    if not recipe:
+        return f"⚠️ Recipe '{recipe_name}' not found in database."
+
+    return answer_with_recipe(recipe_name, recipe, user_question)
 
 
 # ================================
@@ -0,0 +1,382 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from llm_parsing import parse_llm_json
+
+# ==========================================================
+# PROVIDER-AGNOSTIC LLM CALL LAYER
+# ==========================================================
+# Every Gemini / OpenAI call in the project goes through LLMClient so that
+# latency, tokens, retries and cost are recorded in one place.
+#
+#   client = make_client("gemini", api_key)
+#   reply = client.call([prompt, text], model="gemini-2.5-flash", stage="extract")
+#   reply.text, reply.parsed, reply.span
+#
+# Set LLM_BACKEND=fake to run every entry point without network.
+
+# Approximate USD per 1M tokens (input, output); update from provider pricing
+PRICING = {
+    "gemini-3-flash-preview": (0.50, 3.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+}
+
+RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "429", "500", "503", "timeout", "timed out")
+
+
+class LLMError(Exception):
+    def __init__(self, message, span=None):
+        super().__init__(message)
+        self.span = span
+
+    @property
+    def quota_exceeded(self):
+        return "RESOURCE_EXHAUSTED" in str(self) or "429" in str(self)
+
+
+# ==========================================================
+# SPANS & METRICS SINK
+# ==========================================================
+
+@dataclass
+class Span:
+    provider: str
+    model: str
+    stage: str = ""
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    latency_s: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    streamed: bool = False
+    error: str = None
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat())
+
+    @property
+    def cost_usd(self):
+        price_in, price_out = PRICING.get(self.model, (0.0, 0.0))
+        return (self.prompt_tokens * price_in + self.response_tokens * price_out) / 1e6
+
+
+class MetricsSink:
+    """Thread-safe span collector; optionally appends each span to a JSONL file."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({**asdict(span), "cost_usd": span.cost_usd}) + "\n")
+
+    def summary(self):
+        """Aggregate per (stage, model): calls, latency, tokens, cost."""
+        rows = {}
+        with self._lock:
+            spans = list(self.spans)
+
+        for s in spans:
+            row = rows.setdefault((s.stage, s.model), {
+                "stage": s.stage, "model": s.model, "calls": 0, "errors": 0,
+                "cache_hits": 0, "retries": 0, "prompt_tokens": 0,
+                "response_tokens": 0, "latencies": [], "cost_usd": 0.0,
+            })
+            row["calls"] += 1
+            row["errors"] += s.error is not None
+            row["cache_hits"] += s.cache_hit
+            row["retries"] += s.retries
+            row["prompt_tokens"] += s.prompt_tokens
+            row["response_tokens"] += s.response_tokens
+            row["latencies"].append(s.latency_s)
+            row["cost_usd"] += s.cost_usd
+
+        for row in rows.values():
+            lat = sorted(row.pop("latencies"))
+            row["p50_s"] = round(lat[len(lat) // 2], 3)
+            row["max_s"] = round(lat[-1], 3)
+            row["cost_usd"] = round(row["cost_usd"], 6)
+        return list(rows.values())
+
+    def export_jsonl(self, path):
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for s in spans:
+                f.write(json.dumps({**asdict(s), "cost_usd": s.cost_usd}) + "\n")
+        return path
+
+
+METRICS = MetricsSink(os.getenv("LLM_TRACE_FILE"))
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    span: Span
+    parsed: object = None
+    raw: object = None
+
+
+# ==========================================================
+# BACKENDS
+# ==========================================================
+# generate() returns (text, parsed, prompt_tokens, response_tokens, raw)
+# stream() yields text chunks and finally a (prompt_tokens, response_tokens) tuple
+
+class GeminiBackend:
+    provider = "gemini"
+
+    def __init__(self, api_key, timeout=60):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key, http_options={"timeout": int(timeout * 1000)})
+
+    @staticmethod
+    def _usage(response):
+        usage = getattr(response, "usage_metadata", None)
+        if usage is None:
+            return 0, 0
+        return usage.prompt_token_count or 0, usage.candidates_token_count or 0
+
+    def generate(self, model, contents, config=None, system=None):
+        if system:
+            config = {**(config or {}), "system_instruction": system}
+        response = self.client.models.generate_content(model=model, contents=contents, config=config)
+        return (response.text, getattr(response, "parsed", None), *self._usage(response), response)
+
+    def stream(self, model, contents, config=None, system=None):
+        if system:
+            config = {**(config or {}), "system_instruction": system}
+        usage = (0, 0)
+        for chunk in self.client.models.generate_content_stream(model=model, contents=contents, config=config):
+            if getattr(chunk, "usage_metadata", None) is not None:
+                usage = self._usage(chunk)
+            if chunk.text:
+                yield chunk.text
+        yield usage
+
+
+class OpenAIBackend:
+    provider = "openai"
+
+    def __init__(self, api_key, timeout=60):
+        from openai import OpenAI
+
+        self.client = OpenAI(api_key=api_key, timeout=timeout)
+
+    @staticmethod
+    def _request(model, contents, config, system):
+        config = dict(config or {})
+        kwargs = {"model": model}
+        if "temperature" in config:
+            kwargs["temperature"] = config["temperature"]
+        if "max_output_tokens" in config:
+            kwargs["max_tokens"] = config["max_output_tokens"]
+        if config.get("response_mime_type") == "application/json":
+            kwargs["response_format"] = {"type": "json_object"}
+
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": "\n\n".join(str(c) for c in contents)})
+        kwargs["messages"] = messages
+        return kwargs
+
+    def generate(self, model, contents, config=None, system=None):
+        response = self.client.chat.completions.create(**self._request(model, contents, config, system))
+        usage = response.usage
+        return (
+            response.choices[0].message.content or "", None,
+            usage.prompt_tokens if usage else 0,
+            usage.completion_tokens if usage else 0,
+            response,
+        )
+
+    def stream(self, model, contents, config=None, system=None):
+        usage = (0, 0)
+        kwargs = self._request(model, contents, config, system)
+        for chunk in self.client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True}
+        ):
+            if chunk.usage:
+                usage = (chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+        yield usage
+
+
+class FakeBackend:
+    """Offline backend: returns canned text, or the result of `responder(contents)`."""
+
+    provider = "fake"
+
+    def __init__(self, responses=None, latency=0.0):
+        self.responses = responses
+        self.latency = latency
+        self.calls = []
+
+    def _reply(self, contents):
+        self.calls.append(contents)
+        if callable(self.responses):
+            return self.responses(contents)
+        if isinstance(self.responses, list):
+            return self.responses[(len(self.calls) - 1) % len(self.responses)]
+        if self.responses is not None:
+            return self.responses
+        return "{}"
+
+    @staticmethod
+    def _tokens(parts):
+        return sum(len(str(p).split()) for p in parts)
+
+    def generate(self, model, contents, config=None, system=None):
+        time.sleep(self.latency)
+        text = self._reply(contents)
+        return text, None, self._tokens(contents), self._tokens([text]), None
+
+    def stream(self, model, contents, config=None, system=None):
+        text, _, prompt_tokens, response_tokens, _ = self.generate(model, contents, config, system)
+        for word in text.split(" "):
+            yield word + " "
+        yield prompt_tokens, response_tokens
+
+
+# ==========================================================
+# CLIENT
+# ==========================================================
+
+def _is_retryable(error):
+    if isinstance(error, TimeoutError):
+        return True
+    text = f"{type(error).__name__} {error}"
+    return any(marker.lower() in text.lower() for marker in RETRYABLE_MARKERS)
+
+
+def _cache_key(model, contents, config, system):
+    """Only text-only requests are cacheable (images/bytes are skipped)."""
+    if not all(isinstance(c, str) for c in contents):
+        return None
+    blob = json.dumps([model, contents, system, repr(sorted((config or {}).items()))])
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def _parse_schema(text, config):
+    schema = (config or {}).get("response_schema")
+    if schema is None:
+        return None
+    return parse_llm_json(text, schema)
+
+
+class LLMClient:
+    def __init__(self, backend, sink=METRICS, retries=2, backoff=0.5, cache=False):
+        self.backend = backend
+        self.sink = sink
+        self.retries = retries
+        self.backoff = backoff
+        self._cache = {} if cache else None
+
+    def call(self, contents, model, config=None, system=None, stage=""):
+        """Blocking call with retry/backoff; records one span per logical call."""
+        span = Span(provider=self.backend.provider, model=model, stage=stage)
+        key = _cache_key(model, contents, config, system) if self._cache is not None else None
+
+        if key and key in self._cache:
+            cached = self._cache[key]
+            span.cache_hit = True
+            self.sink.record(span)
+            return LLMResponse(text=cached.text, parsed=cached.parsed, span=span)
+
+        start = time.perf_counter()
+        while True:
+            try:
+                text, parsed, span.prompt_tokens, span.response_tokens, raw = \
+                    self.backend.generate(model, contents, config, system)
+                break
+            except Exception as e:
+                if span.retries < self.retries and _is_retryable(e):
+                    time.sleep(self.backoff * (2 ** span.retries))
+                    span.retries += 1
+                    continue
+                span.latency_s = time.perf_counter() - start
+                span.error = f"{type(e).__name__}: {e}"
+                self.sink.record(span)
+                raise LLMError(span.error, span) from e
+
+        span.latency_s = time.perf_counter() - start
+        if parsed is None and text:
+            try:
+                parsed = _parse_schema(text, config)
+            except Exception:
+                parsed = None
+        self.sink.record(span)
+
+        response = LLMResponse(text=text or "", parsed=parsed, span=span, raw=raw)
+        if key:
+            self._cache[key] = response
+        return response
+
+    async def acall(self, contents, model, config=None, system=None, stage=""):
+        """Async variant; runs the blocking call on a worker thread."""
+        return await asyncio.to_thread(self.call, contents, model, config, system, stage)
+
+    def stream(self, contents, model, config=None, system=None, stage=""):
+        """Yield text chunks; the span is recorded once the stream is exhausted."""
+        span = Span(provider=self.backend.provider, model=model, stage=stage, streamed=True)
+        start = time.perf_counter()
+        try:
+            for chunk in self.backend.stream(model, contents, config, system):
+                if isinstance(chunk, tuple):
+                    span.prompt_tokens, span.response_tokens = chunk
+                else:
+                    yield chunk
+        except Exception as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise LLMError(span.error, span) from e
+        finally:
+            span.latency_s = time.perf_counter() - start
+            self.sink.record(span)
+
+
+# ==========================================================
+# FACTORIES
+# ==========================================================
+
+def make_client(provider, api_key=None, timeout=60, **kwargs):
+    """Build an LLMClient; LLM_BACKEND=fake swaps in the offline backend."""
+    if os.getenv("LLM_BACKEND") == "fake":
+        backend = FakeBackend(os.getenv("LLM_FAKE_RESPONSE", "{}"))
+    elif provider == "gemini":
+        backend = GeminiBackend(api_key, timeout)
+    elif provider == "openai":
+        backend = OpenAIBackend(api_key, timeout)
+    elif provider == "fake":
+        backend = FakeBackend()
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    return LLMClient(backend, **kwargs)
+
+
+def client_from_config(config_file, provider="gemini", **kwargs):
+    """Build a client from a config.Config-style file (API_KEY=...)."""
+    from config import Config
+
+    return make_client(provider, Config(config_file).api_key, **kwargs)
+
+
+if __name__ == "__main__":
+    demo = LLMClient(FakeBackend('{"ok": true}', latency=0.01), sink=MetricsSink(), cache=True)
+    for _ in range(3):
+        demo.call(["Extract JSON", "report text"], model="gemini-2.5-flash", stage="demo")
+    "".join(demo.stream(["Suggest recipes"], model="gemini-2.5-flash", stage="demo-stream"))
+
+    for row in demo.sink.summary():
+        print(row)
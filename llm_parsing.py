@@ -0,0 +1,187 @@
+import json
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # orjson is optional; the stdlib decoder gives the same results
+    _loads = json.loads
+
+# ==========================================================
+# SHARED LLM-OUTPUT PARSING
+# ==========================================================
+# Every place that turns model text into data goes through parse_llm_json:
+#
+#   1. fast path   – decode the (fence-stripped) text with orjson
+#   2. local repair – drop trailing commas and close any open brackets of
+#                     a truncated response; a cut inside a key or value
+#                     backs off to the last complete element, so half a
+#                     word never ends up in the data
+#   3. validation  – optionally validate against a pydantic model / type
+#
+# A repairable response is recovered here instead of costing another
+# LLM round trip.
+
+CLOSERS = {"{": "}", "[": "]"}
+_decoder = json.JSONDecoder()
+
+
+class LLMParseError(ValueError):
+    def __init__(self, message, raw):
+        super().__init__(message)
+        self.raw = raw
+
+
+def strip_fences(text):
+    """Body of the first ``` fence, or the outermost JSON-looking span.
+
+    A fence that only follows the JSON ('{"a": 1}\n```') is ignored.
+    """
+    text = text.strip()
+    fence = text.find("```")
+    if fence != -1:
+        body_start = text.find("\n", fence)
+        if body_start == -1:
+            body_start = fence + 3
+        end = text.find("```", body_start)
+        body = text[body_start:end if end != -1 else len(text)].strip()
+        text = body if "{" in body or "[" in body else text[:fence].strip()
+
+    if text[:1] not in "{[":
+        starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+        if starts:
+            text = text[min(starts):]
+    return text
+
+
+def _scan(text):
+    """Single pass over the text outside string literals.
+
+    Returns (cleaned text without trailing commas, open-bracket stack at
+    the end, whether it ends inside a string, whether the root value was
+    closed, comma cuts, bracket cuts). Scanning stops at the bracket that
+    closes the root, so prose after the JSON is dropped, not parsed.
+    A cut is (length of cleaned text, stack) where the text can be closed
+    off as-is: just before a separating comma, or right after an opening
+    bracket (which leaves an empty container, so it is the last resort).
+    """
+    out = []
+    stack = []
+    comma_cuts, bracket_cuts = [], []
+    in_string = escape = False
+    pending_comma = None     # index in `out` of a comma not yet followed by a value
+
+    for ch in text:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch in " \t\r\n":
+            out.append(ch)
+            continue
+
+        if ch in "}]":
+            if pending_comma is not None:
+                out[pending_comma] = ""
+            pending_comma = None
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                return "".join(out), stack, False, True, comma_cuts, bracket_cuts
+            continue
+
+        if ch == ",":
+            comma_cuts.append((len(out), stack[:]))
+            pending_comma = len(out)
+            out.append(ch)
+            continue
+
+        pending_comma = None
+        out.append(ch)
+        if ch in "{[":
+            stack.append(ch)
+            bracket_cuts.append((len(out), stack[:]))
+        elif ch == '"':
+            in_string = True
+
+    return "".join(out), stack, in_string, False, comma_cuts, bracket_cuts
+
+
+def repair_json(text):
+    """Best-effort local fix of fenced, trailing-comma or truncated JSON."""
+    cleaned, stack, in_string, closed, comma_cuts, bracket_cuts = _scan(strip_fences(text))
+
+    candidates = []
+    if not in_string:
+        candidates.append(cleaned.rstrip().rstrip(",") + "".join(CLOSERS[c] for c in reversed(stack)))
+    # Truncated mid-key / mid-value: back off to the last complete element.
+    # A complete root is never cut down, that would silently lose fields.
+    if not closed:
+        for length, cut_stack in comma_cuts[:-4:-1] + bracket_cuts[:-4:-1]:
+            candidates.append(cleaned[:length] + "".join(CLOSERS[c] for c in reversed(cut_stack)))
+
+    for candidate in candidates:
+        try:
+            return _loads(candidate)
+        except ValueError:
+            continue
+    raise LLMParseError("Model returned unrepairable JSON", text)
+
+
+def loads_llm(text):
+    """Decode model output, repairing it locally if the fast path fails."""
+    if not text or not text.strip():
+        raise LLMParseError("Model returned an empty response", text or "")
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+    body = strip_fences(text)
+    try:
+        return _loads(body)
+    except ValueError:
+        pass
+    # Valid JSON followed by prose ("... Let me know if you need more.");
+    # the unstripped text covers fences strip_fences misread
+    for candidate in (body, text.strip()):
+        try:
+            value, _ = _decoder.raw_decode(candidate)
+            return value
+        except ValueError:
+            continue
+    return repair_json(text)
+
+
+def parse_llm_json(text, schema=None):
+    """Decode model output and optionally validate it.
+
+    `schema` may be a pydantic model class (returns an instance) or any type
+    pydantic's TypeAdapter accepts, e.g. ``List[RecipeNote]``.
+    """
+    data = loads_llm(text)
+    if schema is None:
+        return data
+    if hasattr(schema, "model_validate"):
+        return schema.model_validate(data)
+
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(schema).validate_python(data)
+
+
+if __name__ == "__main__":
+    samples = [
+        '```json\n{"conditions": ["GERD"], "medications": ["Omeprazole"],}\n```',
+        'Here is the JSON:\n{"ingredients": ["milk", "eggs", "spin',
+        '{"identified_items": [{"item_name": "Milk", "confidence": "hi',
+        '[{"name": "Kheer", "chef_tip": "Use jaggery"}, {"name": "Po',
+        '{"conditions": ["GERD"], "medications": ["Omeprazole"],}\nLet me know if you need more.',
+    ]
+    for s in samples:
+        print("🔧", json.dumps(loads_llm(s)))
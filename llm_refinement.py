@@ -1,10 +1,155 @@
+import asyncio
+import hashlib
 import json
-from google import genai
+import os
+import re
+from typing import List
+from llm_client import make_client
+from recipe_retrieval import canonical_ingredient
 
 # Gemini API key
 API_KEY = "YOUR_GEMINI_KEY"
 MODEL = "gemini-1.5-pro"
-client = genai.Client(api_key=API_KEY)
+
+BATCH_SIZE = 4          # recipes per LLM call
+MAX_CONCURRENCY = 4     # batches in flight at once
+CACHE_FILE = "refinement_cache.json"
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = make_client("gemini", API_KEY)
+    return _client
+
+
+PROMPT = """
+You are a professional nutritionist AI.
+All recipes below were already checked against the patient's unsafe
+ingredients. For EACH recipe return one entry with its recipe_id unchanged.
+Input is compact JSON: {"patient":...,"conditions":...,"safe":...,"recipes":[...]}
+"""
+
+
+def compact(data):
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
+
+
+# ================= LOCAL FILTERING =================
+def recipe_id(recipe):
+    if recipe.get("id") is not None:
+        return str(recipe["id"])
+    return hashlib.sha1(compact(recipe).encode()).hexdigest()[:16]
+
+
+def recipe_ingredients(recipe):
+    """All ingredient names mentioned by a Spoonacular or catalog recipe."""
+    names = []
+    for key in ("extendedIngredients", "usedIngredients", "missedIngredients", "ingredients"):
+        for ing in recipe.get(key) or []:
+            names.append(ing.get("name", "") if isinstance(ing, dict) else str(ing))
+    return [canonical_ingredient(n) for n in names if n]
+
+
+def filter_unsafe(recipes, unsafe):
+    """Split recipes into (kept, removed) without asking the model.
+
+    Blocked items match whole words only, so "ice" does not block
+    "jeera rice" and "egg" does not block "eggplant". Recipes that carry
+    no ingredient data cannot be checked and are removed as unverified.
+    """
+    blocked = {canonical_ingredient(u) for u in unsafe}
+    blocked.discard("")
+    if not blocked:
+        return list(recipes), []
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(b) for b in sorted(blocked, key=len, reverse=True)) + r")\b")
+
+    kept, removed = [], []
+    for recipe in recipes:
+        ingredients = recipe_ingredients(recipe)
+        if not ingredients:
+            removed.append({"recipe_id": recipe_id(recipe), "title": recipe.get("title"),
+                            "blocked": [], "reason": "no ingredient data"})
+            continue
+        text = " | ".join(ingredients + [canonical_ingredient(recipe.get("title", ""))])
+        hits = sorted(set(pattern.findall(text)))
+        if hits:
+            removed.append({"recipe_id": recipe_id(recipe), "title": recipe.get("title"), "blocked": hits})
+        else:
+            kept.append(recipe)
+    return kept, removed
+
+
+def slim_recipe(recipe):
+    """Only the fields the model needs to write its notes."""
+    return {
+        "recipe_id": recipe_id(recipe),
+        "title": recipe.get("title") or recipe.get("name"),
+        "ingredients": sorted(set(recipe_ingredients(recipe))),
+    }
+
+
+# ================= PER-RECIPE CACHE =================
+def load_cache():
+    if os.path.exists(CACHE_FILE):
+        with open(CACHE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache):
+    with open(CACHE_FILE, "w", encoding="utf-8") as f:
+        json.dump(cache, f, separators=(",", ":"))
+
+
+def profile_hash(context):
+    return hashlib.sha256(compact(context).encode()).hexdigest()[:16]
+
+
+# ================= BATCHED REFINEMENT =================
+async def refine_batch(context, batch, semaphore):
+    from llm_schemas import RefinedRecipe
+
+    async with semaphore:
+        response = await get_client().acall(
+            [PROMPT, compact({**context, "recipes": batch})],
+            model=MODEL,
+            stage="recipe_refinement",
+            config={
+                "temperature": 0.2,
+                "response_mime_type": "application/json",
+                "response_schema": List[RefinedRecipe],
+            },
+        )
+    return response.parsed or []
+
+
+async def refine_all(context, pending):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    batches = [pending[i:i + BATCH_SIZE] for i in range(0, len(pending), BATCH_SIZE)]
+    results = await asyncio.gather(
+        *(refine_batch(context, b, semaphore) for b in batches),
+        return_exceptions=True
+    )
+
+    refined = []
+    for batch, result in zip(batches, results):
+        if isinstance(result, Exception):
+            print(f"⚠️ Batch of {len(batch)} recipes failed: {result}")
+            continue
+        # Only keep entries for recipes we sent; a renamed or invented
+        # recipe_id would otherwise be cached as a refined recipe
+        sent = {r["recipe_id"] for r in batch}
+        entries = [r.model_dump() for r in result]
+        unknown = [e["recipe_id"] for e in entries if e["recipe_id"] not in sent]
+        if unknown:
+            print(f"⚠️ Dropped {len(unknown)} entries with unknown recipe_id: {unknown}")
+        refined.extend(e for e in entries if e["recipe_id"] in sent)
+    return refined
+
 
 def refine_recipes(master_file="master_health_ingredients.json", recipes=None):
     with open(master_file) as f:
@@ -17,47 +162,26 @@ def refine_recipes(master_file="master_health_ingredients.json", recipes=None):
         else:
             unsafe.append(item["name"])
 
-    # Build the multi-step prompt
-    prompt = f"""
-You are a professional nutritionist AI.
-
-Patient profile:
-{json.dumps(master['patient_profile'], indent=2)}
-
-Patient Conditions:
-{json.dumps(master['medical_report'].get('conditions', []), indent=2)}
-
-Safe Ingredients:
-{json.dumps(safe, indent=2)}
+    kept, removed = filter_unsafe(recipes or [], unsafe)
 
-Unsafe Ingredients:
-{json.dumps(unsafe, indent=2)}
+    context = {
+        "patient": master["patient_profile"],
+        "conditions": master["medical_report"].get("conditions", []),
+        "safe": sorted(safe),
+    }
+    prefix = profile_hash({**context, "unsafe": sorted(unsafe)})
 
-Raw API Recipes:
-{json.dumps(recipes, indent=2)}
+    cache = load_cache()
+    slim = [slim_recipe(r) for r in kept]
+    pending = [r for r in slim if f"{prefix}:{r['recipe_id']}" not in cache]
 
-TASKS:
-1. Remove any recipe containing unsafe ingredients.
-2. For each safe recipe, output in JSON:
-   - recipe_name
-   - why_safe
-   - medical_benefit
-   - serving_advice
-   - caution_note
-3. STRICT JSON ONLY.
-"""
-    response = client.models.generate_content(
-        model=MODEL,
-        contents=[prompt],
-        config={"temperature": 0.2}
-    )
+    if pending:
+        for entry in asyncio.run(refine_all(context, pending)):
+            cache[f"{prefix}:{entry['recipe_id']}"] = entry
+        save_cache(cache)
 
-    # Clean and parse
-    try:
-        clean = response.text.strip()
-        return json.loads(clean)
-    except:
-        return {"raw_output": response.text}
+    refined = [cache[f"{prefix}:{r['recipe_id']}"] for r in slim if f"{prefix}:{r['recipe_id']}" in cache]
+    return {"recipes": refined, "removed": removed}
 
 # Quick test
 if __name__ == "__main__":
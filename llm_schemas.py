@@ -0,0 +1,199 @@
+import itertools
+from datetime import datetime
+from typing import Annotated, List, Literal, Optional
+from pydantic import BaseModel, BeforeValidator, Field, field_validator, model_validator
+
+# ==========================================================
+# LLM RESPONSE SCHEMAS
+# ==========================================================
+# pydantic is one of the slower imports in the project, so the pipeline
+# modules import these models inside the functions that call the LLM
+# instead of at module level.
+
+
+class RecipeNote(BaseModel):
+    name: str
+    medical_benefit: str
+    chef_tip: str
+
+
+class RefinedRecipe(BaseModel):
+    recipe_id: str
+    recipe_name: str
+    why_safe: str
+    medical_benefit: str
+    serving_advice: str
+    caution_note: str
+
+
+# ----- universal health report -----
+# The extractor prompt only fixes the outer layout, so the models coerce the
+# usual drift (null for a list, a bare string for a list, objects where
+# strings are expected) instead of rejecting the whole report.
+
+def _text(value):
+    if isinstance(value, dict):
+        name = value.get("name") or value.get("test_name") or value.get("item")
+        rest = ", ".join(f"{k}: {v}" for k, v in value.items() if v not in (None, "", []) and v != name)
+        return f"{name} ({rest})" if name and rest else str(name or rest)
+    return str(value)
+
+
+def _str_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (str, dict)):
+        value = [value]
+    return [_text(v) for v in value if v not in (None, "")]
+
+
+def _optional_str(value):
+    if value is None or isinstance(value, str):
+        return value or None
+    return _text(value)
+
+
+StrList = Annotated[List[str], BeforeValidator(_str_list)]
+OptionalStr = Annotated[Optional[str], BeforeValidator(_optional_str)]
+
+
+class ReportSection(BaseModel):
+    """Base for nested report objects: a null section or a null field with a
+    non-null default means "use the default" (the prompt asks for null
+    whenever something is unknown)."""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _null_is_empty(cls, data):
+        if data is None:
+            return {}
+        if isinstance(data, dict):
+            fields = cls.model_fields
+            return {k: v for k, v in data.items() if v is not None or k not in fields or fields[k].default is None}
+        return data
+
+
+class SourceMetadata(ReportSection):
+    input_type: str = "unknown"
+    file_name: OptionalStr = None
+    capture_date: OptionalStr = None
+
+
+class PatientProfile(ReportSection):
+    name: OptionalStr = None
+    age: Optional[int] = None
+    gender: Optional[Literal["Male", "Female", "Other"]] = None
+    patient_id: OptionalStr = None
+
+    @field_validator("age", mode="before")
+    @classmethod
+    def _age(cls, value):
+        # "45 years" / "45" / 45.0 / 45.5 → 45
+        if isinstance(value, str):
+            digits = "".join(itertools.takewhile(str.isdigit, value.strip()))
+            return int(digits) if digits else None
+        if isinstance(value, float):
+            return int(value)
+        return value
+
+    @field_validator("gender", mode="before")
+    @classmethod
+    def _gender(cls, value):
+        if not value:
+            return None
+        value = str(value).strip().lower()
+        return {"male": "Male", "m": "Male", "female": "Female", "f": "Female"}.get(value, "Other")
+
+    @field_validator("patient_id", mode="before")
+    @classmethod
+    def _patient_id(cls, value):
+        return None if value is None else str(value)
+
+
+REPORT_TYPES = ("lab", "prescription", "discharge", "clinical_note", "imaging", "mixed", "unknown")
+
+
+class EncounterInfo(ReportSection):
+    report_date: OptionalStr = None
+    facility_name: OptionalStr = None
+    doctor_name: OptionalStr = None
+    department: OptionalStr = None
+    report_type: Literal[REPORT_TYPES] = "unknown"
+
+    @field_validator("report_type", mode="before")
+    @classmethod
+    def _report_type(cls, value):
+        value = str(value or "unknown").strip().lower().replace(" ", "_")
+        return value if value in REPORT_TYPES else "unknown"
+
+
+class Diagnoses(ReportSection):
+    primary: StrList = Field(default_factory=list)
+    secondary: StrList = Field(default_factory=list)
+
+    @model_validator(mode="before")
+    @classmethod
+    def _bare_list(cls, data):
+        # ["GERD", ...] instead of {"primary": [...], "secondary": [...]}
+        return {"primary": data} if isinstance(data, (list, str)) else data
+
+
+class Allergies(ReportSection):
+    medications: StrList = Field(default_factory=list)
+    food: StrList = Field(default_factory=list)
+    environmental: StrList = Field(default_factory=list)
+    unknown_reported: bool = False
+
+
+class Findings(ReportSection):
+    physical_exam: StrList = Field(default_factory=list)
+    imaging_summary: StrList = Field(default_factory=list)
+    doctor_notes: StrList = Field(default_factory=list)
+
+
+class LifestyleAndRisk(ReportSection):
+    habits: StrList = Field(default_factory=list)
+    dietary_notes: StrList = Field(default_factory=list)
+    risk_factors: StrList = Field(default_factory=list)
+
+
+class Recommendations(ReportSection):
+    follow_up: OptionalStr = None
+    next_appointment: OptionalStr = None
+    suggested_labs: StrList = Field(default_factory=list)
+    referrals: StrList = Field(default_factory=list)
+
+
+class SystemGenerated(ReportSection):
+    confidence_score: Optional[float] = None
+    processing_notes: OptionalStr = None
+
+    @field_validator("confidence_score", mode="before")
+    @classmethod
+    def _confidence(cls, value):
+        # "high" and other non-numeric scores carry no usable number
+        try:
+            return None if value is None or isinstance(value, bool) else float(value)
+        except (TypeError, ValueError):
+            return None
+
+
+class UniversalHealthReport(BaseModel):
+    source_metadata: SourceMetadata = Field(default_factory=SourceMetadata)
+    patient_profile: PatientProfile = Field(default_factory=PatientProfile)
+    encounter_info: EncounterInfo = Field(default_factory=EncounterInfo)
+    symptoms: StrList = Field(default_factory=list)
+    diagnoses: Diagnoses = Field(default_factory=Diagnoses)
+    allergies: Allergies = Field(default_factory=Allergies)
+    medications_current: StrList = Field(default_factory=list)
+    lab_results: StrList = Field(default_factory=list)
+    findings: Findings = Field(default_factory=Findings)
+    lifestyle_and_risk: LifestyleAndRisk = Field(default_factory=LifestyleAndRisk)
+    recommendations: Recommendations = Field(default_factory=Recommendations)
+    system_generated: SystemGenerated = Field(default_factory=SystemGenerated)
+    last_updated: str = Field(default_factory=lambda: datetime.now().isoformat())
+
+    @field_validator("last_updated", mode="before")
+    @classmethod
+    def _last_updated(cls, value):
+        return value or datetime.now().isoformat()
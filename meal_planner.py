@@ -0,0 +1,262 @@
+import json
+from datetime import date
+import numpy as np
+from scipy.sparse import csr_matrix
+from build_master_json import analyze_item_safety, daily_meal_recommendations, days_until
+from recipe_retrieval import CATALOG_FILE, canonical_ingredient, profile_from_clinical
+
+# ==========================================================
+# WEEKLY MEAL-PLAN OPTIMIZER
+# ==========================================================
+# PlannerIndex precomputes everything that only depends on the catalog
+# (recipe × ingredient incidence, nutrient matrix, course masks) once.
+# Per patient we only build three vectors over the ingredient vocab
+# (unsafe, expiring, available), turn them into per-recipe scores with
+# sparse products, then fill the week greedily and refine by local search.
+#
+#   index = PlannerIndex.from_file()
+#   plan = plan_week(index, clinical, fridge_items)
+
+DAYS = 7
+SLOTS = {"breakfast": ["snack", "starter"], "lunch": ["main course"], "dinner": ["main course"]}
+PLAN_NUTRIENTS = ["calories", "protein_g", "fat_g", "carbs_g", "sugar_g", "sodium_mg"]
+
+# Daily targets for a generic adult; a patient dict may override any of them
+DAILY_TARGETS = {
+    "calories": 2000, "protein_g": 60, "fat_g": 65, "carbs_g": 275,
+    "sugar_g": 50, "sodium_mg": 2000,
+}
+
+# Condition keys (see recipe_retrieval.CONDITION_KEYWORDS) → required dietary_profile flag
+CONDITION_FLAGS = {"diabetes": "diabetic_safe", "renal": "renal_safe"}
+
+# Score weights
+W_EXPIRY = 3.0       # using an item close to its expiry date
+W_PANTRY = 1.0       # share of the recipe already in the fridge
+W_NUTRIENT = 1.0     # distance from the per-slot nutrient target
+REPEAT_GAP = 3       # min days between repeats when the week can't be repeat-free
+LOCAL_SEARCH_CANDIDATES = 8
+
+
+class PlannerIndex:
+    def __init__(self, recipes):
+        self.recipes = recipes
+        self.names = [r["name"] for r in recipes]
+
+        vocab = {}
+        indptr, indices = [0], []
+        for r in recipes:
+            row = {vocab.setdefault(c, len(vocab))
+                   for c in (canonical_ingredient(i) for i in r.get("ingredients", [])) if c}
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+        self.vocab = list(vocab)
+        self.vocab_index = vocab
+        self.incidence = csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(recipes), len(vocab))
+        )
+        self.sizes = np.maximum(np.diff(self.incidence.indptr), 1)
+
+        self.nutrients = np.array(
+            [[(r.get("nutrition") or {}).get(n) or 0.0 for n in PLAN_NUTRIENTS] for r in recipes],
+            dtype=np.float64
+        )
+        self.flags = {
+            flag: np.array([bool((r.get("dietary_profile") or {}).get(flag)) for r in recipes])
+            for flag in set(CONDITION_FLAGS.values())
+        }
+        courses = np.array([r.get("course", "") for r in recipes])
+        self.slot_masks = {slot: np.isin(courses, wanted) for slot, wanted in SLOTS.items()}
+
+        self._unsafe_cache = {}
+
+    @classmethod
+    def from_file(cls, path=CATALOG_FILE):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    # ----- per-patient vectors -----
+    def unsafe_vector(self, conditions, allergies, medications):
+        """1.0 for vocab ingredients the rule engine blocks; cached per profile."""
+        key = (tuple(sorted(conditions)), tuple(sorted(allergies)), tuple(sorted(medications)))
+        if key not in self._unsafe_cache:
+            self._unsafe_cache[key] = np.array([
+                not analyze_item_safety(conditions, allergies, medications, {"name": term})[0]
+                for term in self.vocab
+            ], dtype=np.float64)
+        return self._unsafe_cache[key]
+
+    def fridge_vectors(self, fridge_items, today):
+        """(expiry urgency, availability) over the vocab from fridge items."""
+        urgency = np.zeros(len(self.vocab))
+        available = np.zeros(len(self.vocab))
+        for item in fridge_items:
+            idx = self.vocab_index.get(canonical_ingredient(item.get("name", "")))
+            if idx is None:
+                continue
+            days = days_until(item.get("expiry_date"), today)
+            if days is not None and days < 0:
+                continue  # expired items are not cooked with
+            available[idx] = 1.0
+            if days is not None:
+                urgency[idx] = max(urgency[idx], 1.0 / (1.0 + days))
+        return urgency, available
+
+
+# ==========================================================
+# PLANNING
+# ==========================================================
+
+def _feasible(index, conditions, allergies, medications):
+    blocked = index.incidence @ index.unsafe_vector(conditions, allergies, medications)
+    ok = blocked == 0
+    for cond, flag in CONDITION_FLAGS.items():
+        if cond in conditions:
+            ok &= index.flags[flag]
+    return ok
+
+
+def _nutrient_cost(index, targets):
+    """Normalized L1 distance of every recipe from one slot's share of the day."""
+    per_slot = np.array([targets[n] for n in PLAN_NUTRIENTS]) / len(SLOTS)
+    return np.abs(index.nutrients - per_slot).dot(1.0 / per_slot) / len(PLAN_NUTRIENTS)
+
+
+def _plan_objective(index, plan_rows, base_score, targets):
+    """Total score minus the weekly nutrient deviation of the whole plan."""
+    rows = [r for day in plan_rows for r in day.values() if r is not None]
+    if not rows:
+        return -np.inf
+    weekly = index.nutrients[rows].sum(axis=0)
+    target = np.array([targets[n] for n in PLAN_NUTRIENTS]) * DAYS
+    deviation = np.abs(weekly - target).dot(1.0 / target) / len(PLAN_NUTRIENTS)
+    return base_score[rows].sum() - W_NUTRIENT * DAYS * deviation
+
+
+def _repeats_ok(plan_rows, day, slot, row, gap=DAYS):
+    """True if `row` is not served elsewhere within `gap` days of `day`."""
+    for d, slots in enumerate(plan_rows):
+        for s, r in slots.items():
+            if r == row and (d, s) != (day, slot) and abs(d - day) < gap:
+                return False
+    return True
+
+
+def plan_week(index, clinical=None, fridge_items=(), targets=None, today=None, seed=0):
+    """Pick a 7-day plan of catalog recipes for one patient.
+
+    Greedy fill uses expiring items first (their urgency is spent once a
+    recipe consumes them), then a local search swaps single slots while the
+    weekly objective improves.
+    """
+    today = today or date.today()
+    targets = {**DAILY_TARGETS, **(targets or {})}
+    conditions, allergies, medications = profile_from_clinical(clinical)
+
+    feasible = _feasible(index, conditions, allergies, medications)
+    urgency, available = index.fridge_vectors(fridge_items, today)
+    pantry = (index.incidence @ available) / index.sizes
+    nutrient_cost = _nutrient_cost(index, targets)
+    base_score = W_PANTRY * pantry - W_NUTRIENT * nutrient_cost
+
+    # ----- greedy fill -----
+    plan_rows = [{slot: None for slot in SLOTS} for _ in range(DAYS)]
+    remaining = urgency.copy()
+    for day in range(DAYS):
+        for slot, mask in index.slot_masks.items():
+            score = base_score + W_EXPIRY * (index.incidence @ remaining)
+            score = np.where(feasible & mask, score, -np.inf)
+            candidates = np.flatnonzero(np.isfinite(score))
+            ranked = candidates[np.argsort(-score[candidates])]
+            # Prefer a repeat-free week; fall back to spacing repeats out
+            row = next((r for r in ranked if _repeats_ok(plan_rows, day, slot, r)), None)
+            if row is None:
+                row = next((r for r in ranked if _repeats_ok(plan_rows, day, slot, r, REPEAT_GAP)), None)
+            if row is None:
+                continue
+
+            plan_rows[day][slot] = int(row)
+            # Items this recipe uses no longer count as "to use up"
+            used = index.incidence.indices[index.incidence.indptr[row]:index.incidence.indptr[row + 1]]
+            remaining[used] = 0.0
+
+    # ----- local search -----
+    rng = np.random.default_rng(seed)
+    expiry_score = W_EXPIRY * (index.incidence @ urgency)
+    total_score = base_score + expiry_score
+    best = _plan_objective(index, plan_rows, total_score, targets)
+    for _ in range(DAYS * len(SLOTS)):
+        day = int(rng.integers(DAYS))
+        slot = list(SLOTS)[int(rng.integers(len(SLOTS)))]
+        candidates = np.flatnonzero(feasible & index.slot_masks[slot])
+        if not len(candidates):
+            continue
+        top = candidates[np.argsort(-total_score[candidates])[:LOCAL_SEARCH_CANDIDATES]]
+        current = plan_rows[day][slot]
+        for row in top:
+            if row == current or not _repeats_ok(plan_rows, day, slot, row):
+                continue
+            plan_rows[day][slot] = int(row)
+            value = _plan_objective(index, plan_rows, total_score, targets)
+            if value > best:
+                best, current = value, int(row)
+            else:
+                plan_rows[day][slot] = current
+
+    return _render_plan(index, plan_rows, urgency, conditions, fridge_items)
+
+
+def _render_plan(index, plan_rows, urgency, conditions, fridge_items):
+    days = []
+    for d, slots in enumerate(plan_rows):
+        meals = {}
+        for slot, row in slots.items():
+            if row is None:
+                meals[slot] = None
+                continue
+            used = index.incidence.indices[index.incidence.indptr[row]:index.incidence.indptr[row + 1]]
+            meals[slot] = {
+                "name": index.names[row],
+                "uses_expiring": [index.vocab[i] for i in used if urgency[i] > 0],
+            }
+        rows = [r for r in slots.values() if r is not None]
+        totals = index.nutrients[rows].sum(axis=0) if rows else np.zeros(len(PLAN_NUTRIENTS))
+        days.append({
+            "day": d + 1,
+            "meals": meals,
+            "nutrition": {n: round(float(v), 1) for n, v in zip(PLAN_NUTRIENTS, totals)},
+        })
+
+    return {
+        "days": days,
+        "advice": daily_meal_recommendations(conditions, list(fridge_items)),
+    }
+
+
+def plan_batch(index, patients, today=None):
+    """Plan for many patients against one shared index (nightly batch).
+
+    Each patient is a dict with "clinical", optional "fridge_items" and
+    optional "targets".
+    """
+    today = today or date.today()
+    return [
+        plan_week(index, p.get("clinical"), p.get("fridge_items", []), p.get("targets"), today)
+        for p in patients
+    ]
+
+
+if __name__ == "__main__":
+    with open("medical_report.json") as f:
+        report = json.load(f)
+
+    fridge = [
+        {"name": "Spinach", "expiry_date": str(date.today())},
+        {"name": "Potatoes", "expiry_date": "2099-01-01"},
+        {"name": "Milk", "expiry_date": str(date.today())},
+    ]
+    plan = plan_week(PlannerIndex.from_file(), report, fridge)
+    for day in plan["days"]:
+        meals = ", ".join(f"{s}: {m['name'] if m else '-'}" for s, m in day["meals"].items())
+        print(f"Day {day['day']}: {meals}  ({day['nutrition']['calories']:.0f} kcal)")
+    print("💡", "; ".join(plan["advice"]))
@@ -0,0 +1,267 @@
+import re
+import numpy as np
+from scipy.sparse import csr_matrix
+from recipe_retrieval import canonical_ingredient
+
+# ==========================================================
+# NUTRITION ENRICHMENT
+# ==========================================================
+# Canonical ingredients are resolved to a reference food with per-100g
+# nutrients and a default portion. For the whole catalog at once:
+#
+#   grams     (recipes × ingredients, sparse)  default portion per use
+#   per_gram  (ingredients × nutrients)        reference food / 100
+#   totals    = grams @ per_gram               per-serving nutrition
+#
+# Values are estimates for one serving built from default portions.
+
+NUTRIENTS = ["calories", "protein_g", "fat_g", "carbs_g", "sugar_g", "sodium_mg", "potassium_mg"]
+
+# reference food: ((kcal, protein, fat, carbs, sugar, sodium mg, potassium mg) per 100 g, portion g)
+REFERENCE_FOODS = {
+    "sugar":          ((387, 0, 0, 100, 100, 1, 2), 20),
+    "jaggery":        ((383, 0.4, 0.1, 98, 85, 30, 1050), 20),
+    "honey":          ((304, 0.3, 0, 82, 82, 4, 52), 15),
+    "syrup":          ((260, 0, 0, 65, 65, 2, 5), 30),
+    "ghee":           ((876, 0.3, 99.5, 0, 0, 2, 5), 10),
+    "butter":         ((717, 0.9, 81, 0.1, 0.1, 11, 24), 10),
+    "oil":            ((884, 0, 100, 0, 0, 0, 0), 10),
+    "milk":           ((61, 3.2, 3.3, 4.8, 5, 43, 150), 150),
+    "condensed milk": ((321, 7.9, 8.7, 54, 54, 127, 371), 40),
+    "milk solids":    ((421, 14, 26, 25, 20, 80, 500), 40),
+    "cream":          ((340, 2.8, 36, 2.7, 2.9, 27, 95), 30),
+    "yogurt":         ((61, 3.5, 3.3, 4.7, 4.7, 46, 155), 100),
+    "paneer":         ((265, 18, 20, 1.2, 1.2, 18, 100), 80),
+    "egg":            ((143, 12.6, 9.5, 0.7, 0.4, 142, 138), 50),
+    "chicken":        ((165, 31, 3.6, 0, 0, 74, 256), 120),
+    "red meat":       ((250, 26, 16, 0, 0, 72, 310), 120),
+    "seafood":        ((120, 22, 3, 0, 0, 90, 350), 120),
+    "rice":           ((365, 7.1, 0.7, 80, 0.1, 5, 115), 60),
+    "rice flour":     ((366, 6, 1.4, 80, 0.1, 0, 76), 50),
+    "rice flake":     ((346, 6.6, 1.2, 77, 0, 10, 100), 50),
+    "wheat flour":    ((364, 10, 1, 76, 0.3, 2, 107), 60),
+    "semolina":       ((360, 12.7, 1.1, 73, 0, 1, 186), 50),
+    "bread":          ((265, 9, 3.2, 49, 5, 490, 115), 60),
+    "gram flour":     ((387, 22, 6.7, 58, 11, 64, 846), 50),
+    "millet flour":   ((360, 10, 3.5, 73, 1, 5, 300), 60),
+    "pulse":          ((350, 24, 1.5, 60, 2, 15, 950), 50),
+    "chickpea":       ((364, 19, 6, 61, 11, 24, 875), 60),
+    "potato":         ((77, 2, 0.1, 17, 0.8, 6, 425), 100),
+    "sweet potato":   ((86, 1.6, 0.1, 20, 4.2, 55, 337), 100),
+    "vegetable":      ((30, 1.5, 0.2, 6, 3, 20, 250), 80),
+    "leafy green":    ((23, 2.9, 0.4, 3.6, 0.4, 79, 558), 60),
+    "tomato":         ((18, 0.9, 0.2, 3.9, 2.6, 5, 237), 60),
+    "onion":          ((40, 1.1, 0.1, 9.3, 4.2, 4, 146), 50),
+    "mushroom":       ((22, 3.1, 0.3, 3.3, 2, 5, 318), 60),
+    "fruit":          ((80, 1, 0.3, 20, 15, 1, 300), 60),
+    "dried fruit":    ((299, 3, 0.5, 79, 59, 11, 749), 15),
+    "nut":            ((580, 20, 48, 22, 5, 10, 650), 15),
+    "coconut":        ((354, 3.3, 33, 15, 6, 20, 356), 30),
+    "coconut milk":   ((230, 2.3, 24, 6, 3.3, 15, 263), 80),
+    "seed":           ((570, 18, 50, 23, 0.3, 11, 470), 5),
+    "aromatic":       ((60, 2, 0.5, 13, 1.7, 13, 400), 10),
+    "spice":          ((300, 12, 12, 50, 2, 50, 1500), 2),
+    "souring":        ((30, 0.5, 0.2, 8, 3, 5, 100), 10),
+    "soy sauce":      ((53, 8, 0.6, 5, 0.4, 5493, 435), 10),
+    "tomato sauce":   ((82, 1.2, 0.2, 19, 15, 1000, 280), 20),
+    "salt":           ((0, 0, 0, 0, 0, 38758, 8), 3),
+    "baking soda":    ((0, 0, 0, 0, 0, 27360, 0), 1),
+    "water":          ((0, 0, 0, 0, 0, 0, 0), 0),
+}
+
+ANIMAL_FOODS = {"ghee", "butter", "milk", "condensed milk", "milk solids", "cream", "yogurt",
+                "paneer", "egg", "chicken", "red meat", "seafood", "honey"}
+GLUTEN_FOODS = {"wheat flour", "semolina", "bread"}
+
+# First matching whole-word pattern wins, so specific names come first
+KEYWORD_RULES = [
+    (r"coconut milk", "coconut milk"),
+    (r"condensed milk|sweetened milk|reduced milk", "condensed milk"),
+    (r"milk powder|milk power|khoa|mawa", "milk solids"),
+    (r"coconut oil|mustard oil|olive oil|sesame oil|oil", "oil"),
+    (r"ghee|clarified butter", "ghee"),
+    (r"butter", "butter"),
+    (r"cream|malai", "cream"),
+    (r"milk", "milk"),
+    (r"yogurt|yoghurt|curd|dahi", "yogurt"),
+    (r"paneer|chhena|chenna|cottage cheese|cheese", "paneer"),
+    (r"egg|egg yolk", "egg"),
+    (r"chicken", "chicken"),
+    (r"mutton|lamb|pork|beef|axone", "red meat"),
+    (r"fish|prawn|lobster|bombay duck|fish roe", "seafood"),
+    (r"sugar syrup|rose syrup|jaggery syrup|syrup", "syrup"),
+    (r"jaggery|gur", "jaggery"),
+    (r"honey", "honey"),
+    (r"sugar", "sugar"),
+    (r"rice flour|corn flour|arrowroot powder", "rice flour"),
+    (r"poha|rice flake|beaten rice", "rice flake"),
+    (r"gram flour|besan|chickpea flour|lentil flour|sattu|sev|boondi", "gram flour"),
+    (r"jowar|bajra|pearl millet|makki|sorghum", "millet flour"),
+    (r"semolina|rava|sooji|suji", "semolina"),
+    (r"bread|naan|pav|bhatura|dinner roll|loaf", "bread"),
+    (r"flour|maida|atta|dough|vermicelli|sevai", "wheat flour"),
+    (r"rice|sabudana", "rice"),
+    (r"bell pepper|capsicum|shimla mirch|green bean|french bean|long bean|green pea", "vegetable"),
+    (r"chickpea|chole|kala chana|bhuna chana", "chickpea"),
+    (r"dal|daal|lentil|moong|urad|pea|bean|gram|pigeon pea|rajma", "pulse"),
+    (r"sweet potato", "sweet potato"),
+    (r"potato|aloo", "potato"),
+    (r"tomato sauce", "tomato sauce"),
+    (r"soy sauce", "soy sauce"),
+    (r"tomato paste|chopped tomato|tomato", "tomato"),
+    (r"onion", "onion"),
+    (r"mushroom", "mushroom"),
+    (r"spinach|palak|methi leave|fenugreek leave|amaranth|mustard green|watercress|arbi ke patte|colocasia", "leafy green"),
+    (r"sesame|poppy|chia|khus|melon seed", "seed"),
+    (r"banana flower|raw banana", "vegetable"),
+    (r"raisin|dried fruit|dry fruit|dry date|dried mango|apricot", "dried fruit"),
+    (r"banana|mango|pomegranate|date|gooseberry|orange|musk melon|papaya", "fruit"),
+    (r"cashew|almond|pistachio|peanut|badam|nut", "nut"),
+    (r"coconut", "coconut"),
+    (r"ginger|garlic|curry leave|chil+ie?|chili|coriander|cilantro|mint", "aromatic"),
+    (r"lemon|lime|tamarind|imli|kokum|amchur|vinegar|citric acid", "souring"),
+    (r"salt", "salt"),
+    (r"baking soda|baking powder", "baking soda"),
+    (r"water", "water"),
+    (r"masala|powder|turmeric|cardamom|elachi|cinnamon|pepper|bay leaf|saffron|fennel|"
+     r"mustard|cumin|jeera|clove|anise|nigella|fenugreek|kasuri methi|kewra|rose water|panch phoran|spice", "spice"),
+    (r"gourd|carrot|cabbage|cauliflower|gobi|brinjal|eggplant|baingan|okra|ladies finger|drumstick|"
+     r"cucumber|beetroot|pumpkin|corn|yam|tindora|potol|papdi|bamboo shoot|vegetable|green", "vegetable"),
+]
+
+_COMPILED_RULES = [(re.compile(rf"\b(?:{pattern})\b"), food) for pattern, food in KEYWORD_RULES]
+
+# dietary_profile thresholds per estimated serving
+DIABETIC_MAX_SUGAR_G = 10
+DIABETIC_MAX_CARBS_G = 90
+RENAL_MAX_SODIUM_MG = 800
+RENAL_MAX_POTASSIUM_MG = 1200
+# Source ingredient lists often leave out the sugar, so sweets are never
+# flagged diabetic-safe on their estimated numbers alone
+SWEET_COURSES = {"dessert"}
+# ... and the salt: a savoury dish that does not list it gets this much
+DEFAULT_SALT_G = 1.0
+
+
+def resolve_food(ingredient):
+    """Reference food for a canonical ingredient, or None if unknown."""
+    if ingredient in REFERENCE_FOODS:
+        return ingredient
+    for pattern, food in _COMPILED_RULES:
+        if pattern.search(ingredient):
+            return food
+    return None
+
+
+# ==========================================================
+# MATRIX BUILD
+# ==========================================================
+
+def build_matrices(recipes):
+    """Return (grams, per_gram, vocab, foods) for a list of recipes."""
+    vocab = {}
+    indptr = [0]
+    indices = []
+    for recipe in recipes:
+        seen = set()
+        for ing in recipe.get("ingredients", []):
+            canon = canonical_ingredient(ing)
+            if canon and canon not in seen:
+                seen.add(canon)
+                indices.append(vocab.setdefault(canon, len(vocab)))
+        indptr.append(len(indices))
+
+    foods = [resolve_food(term) for term in vocab]
+    portion = np.array([REFERENCE_FOODS[f][1] if f else 0 for f in foods], dtype=np.float64)
+    per_gram = np.array(
+        [REFERENCE_FOODS[f][0] if f else (0,) * len(NUTRIENTS) for f in foods],
+        dtype=np.float64
+    ).reshape(len(foods), len(NUTRIENTS)) / 100.0
+
+    indices = np.array(indices, dtype=np.int64)
+    grams = csr_matrix(
+        (portion[indices], indices, np.array(indptr, dtype=np.int64)),
+        shape=(len(recipes), len(vocab))
+    )
+    return grams, per_gram, list(vocab), foods
+
+
+def is_sweet_dish(recipe):
+    return (str(recipe.get("course", "")).lower() in SWEET_COURSES
+            or str(recipe.get("flavor_profile", "")).lower() == "sweet")
+
+
+def is_non_vegetarian(recipe):
+    return str(recipe.get("diet", "")).lower().replace("-", " ") == "non vegetarian"
+
+
+def compute_nutrition(recipes):
+    """Vectorized per-serving nutrition and dietary flags for all recipes.
+
+    Returns (totals ndarray[recipes, NUTRIENTS], flags dict of bool arrays,
+    coverage ndarray of mapped-ingredient fractions).
+    """
+    grams, per_gram, vocab, foods = build_matrices(recipes)
+    totals = np.asarray(grams @ per_gram)
+
+    present = grams.copy()
+    present.data = np.ones_like(present.data)
+    mapped = np.array([f is not None for f in foods], dtype=np.float64)
+    animal = np.array([f in ANIMAL_FOODS for f in foods], dtype=np.float64)
+    gluten = np.array([f in GLUTEN_FOODS for f in foods], dtype=np.float64)
+
+    counts = np.diff(present.indptr)
+    coverage = np.divide(present @ mapped, counts, out=np.zeros(len(recipes)), where=counts > 0)
+
+    # Unmapped ingredients add nothing to the totals, so a low estimate only
+    # counts when every ingredient is known
+    complete = coverage == 1.0
+    sweet = np.array([is_sweet_dish(r) for r in recipes], dtype=bool)
+    non_veg = np.array([is_non_vegetarian(r) for r in recipes], dtype=bool)
+
+    salt = np.array([f == "salt" for f in foods], dtype=np.float64)
+    unsalted = ~sweet & ((present @ salt) == 0)
+    sodium = NUTRIENTS.index("sodium_mg")
+    totals[unsalted, sodium] += DEFAULT_SALT_G * REFERENCE_FOODS["salt"][0][sodium] / 100.0
+
+    col = {n: totals[:, i] for i, n in enumerate(NUTRIENTS)}
+    flags = {
+        "vegan": ((present @ animal) == 0) & ~non_veg,
+        "gluten_free": (present @ gluten) == 0,
+        "diabetic_safe": complete & ~sweet
+                         & (col["sugar_g"] <= DIABETIC_MAX_SUGAR_G) & (col["carbs_g"] <= DIABETIC_MAX_CARBS_G),
+        "renal_safe": complete
+                      & (col["sodium_mg"] <= RENAL_MAX_SODIUM_MG) & (col["potassium_mg"] <= RENAL_MAX_POTASSIUM_MG),
+    }
+    return totals, flags, coverage
+
+
+def enrich_recipes(recipes):
+    """Fill missing nutrition fields and add dietary_profile in place."""
+    if not recipes:
+        return recipes
+
+    totals, flags, coverage = compute_nutrition(recipes)
+    rounded = np.round(totals, 1).tolist()
+
+    for i, recipe in enumerate(recipes):
+        nutrition = recipe.setdefault("nutrition", {})
+        for j, name in enumerate(NUTRIENTS):
+            if nutrition.get(name) is None:
+                nutrition[name] = rounded[i][j]
+        nutrition["coverage"] = round(float(coverage[i]), 2)
+        recipe["dietary_profile"] = {name: bool(values[i]) for name, values in flags.items()}
+    return recipes
+
+
+if __name__ == "__main__":
+    import json
+
+    with open("data/processed_recipes.json") as f:
+        catalog = json.load(f)
+
+    _, _, vocab, foods = build_matrices(catalog)
+    unmapped = [term for term, food in zip(vocab, foods) if food is None]
+    print(f"🧮 {len(vocab) - len(unmapped)}/{len(vocab)} ingredients mapped to reference foods")
+    if unmapped:
+        print("❓ Unmapped:", ", ".join(unmapped))
@@ -1,16 +1,19 @@
-import pandas as pd
 import json
+import os
+from nutrition import enrich_recipes
+from recipe_catalog import columns_dir, convert_json
+from recipe_dedup import dedup_recipes
 
-# Load CSV
-df = pd.read_csv("data/indian_food.csv")
+CSV_FILE = "data/indian_food.csv"
+OUTPUT_FILE = "data/processed_recipes.json"
+MERGE_REPORT_FILE = "recipe_merge_report.json"
 
 # Function to clean text
 def clean_text(x):
     return str(x).replace("\n", " ").strip()
 
-recipes = []
-for _, row in df.iterrows():
-    recipe = {
+def build_recipe(row):
+    return {
         "name": clean_text(row.get("name", "")),
         "cuisine": "Indian",  # all from this dataset
         "ingredients": clean_text(row.get("ingredients", "")).split(", "),
@@ -26,10 +29,42 @@ for _, row in df.iterrows():
             "carbs_g": row.get("carbs_g", None)
         }
     }
-    recipes.append(recipe)
 
-# Save as JSON
-with open("data/processed_recipes.json", "w") as f:
-    json.dump(recipes, f, indent=4)
+def process_csv(csv_files=CSV_FILE, output_file=OUTPUT_FILE, report_file=MERGE_REPORT_FILE):
+    import pandas as pd  # only needed once a CSV is actually processed
 
-print(f"✅ Processed {len(recipes)} recipes to JSON: data/processed_recipes.json")
+    if isinstance(csv_files, str):
+        csv_files = [csv_files]
+
+    # Load every source CSV, remembering where each row came from
+    recipes, sources = [], []
+    for csv_file in csv_files:
+        df = pd.read_csv(csv_file)
+        name = os.path.basename(csv_file)
+        for i, row in df.iterrows():
+            recipes.append(build_recipe(row))
+            sources.append(f"{name}#{i}")
+
+    # The same dish listed by several sources is kept once
+    recipes, report = dedup_recipes(recipes, sources)
+    if report_file:
+        with open(report_file, "w") as f:
+            json.dump(report, f, indent=4)
+
+    # Nutrition + dietary_profile for the whole catalog in one matrix product
+    enrich_recipes(recipes)
+
+    # Save as JSON, plus the columnar copy the service loads from
+    with open(output_file, "w") as f:
+        json.dump(recipes, f, indent=4)
+    convert_json(output_file, columns_dir(output_file))
+
+    return recipes
+
+if __name__ == "__main__":
+    import sys
+
+    recipes = process_csv(sys.argv[1:] or CSV_FILE)
+    print(f"✅ Processed {len(recipes)} recipes to JSON: {OUTPUT_FILE}")
+    print(f"🗂️ Columnar catalog: {columns_dir(OUTPUT_FILE)}/")
+    print(f"🔗 Merge report: {MERGE_REPORT_FILE}")
@@ -1,10 +1,22 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from constraint_engine import filter_ingredients
 
 # Replace with your Spoonacular API key
 API_KEY = "YOUR_SPOONACULAR_KEY"
 BASE_URL = "https://api.spoonacular.com/recipes/complexSearch"
 
+CACHE_FILE = "spoonacular_cache.json"
+CACHE_TTL = 6 * 60 * 60          # seconds
+TIMEOUT = (3.05, 10)             # (connect, read) seconds
+
 # Map patient conditions to API parameters
 CONDITION_TO_API = {
     "diabetes": {"maxSugar": 5, "diet": "low-glycemic"},
@@ -12,12 +24,124 @@ CONDITION_TO_API = {
     "anxiety": {"excludeIngredients": "caffeine"}
 }
 
+
+# ================= CLIENT =================
+class SpoonacularClient:
+    """Pooled, retrying Spoonacular client with a persistent TTL cache."""
+
+    def __init__(self, api_key=API_KEY, base_url=BASE_URL, timeout=TIMEOUT,
+                 retries=3, backoff=0.5, cache_file=CACHE_FILE, ttl=CACHE_TTL,
+                 pool_size=10):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.ttl = ttl
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._cache = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "errors": 0}
+
+    # ----- cache -----
+    @staticmethod
+    def cache_key(params):
+        """Stable key: API key dropped, comma lists lowercased and sorted."""
+        norm = {}
+        for k, v in params.items():
+            if k == "apiKey" or v in (None, ""):
+                continue
+            if isinstance(v, str):
+                parts = sorted({p.strip().lower() for p in v.split(",") if p.strip()})
+                v = ",".join(parts)
+            norm[k] = v
+        return hashlib.sha256(json.dumps(norm, sort_keys=True).encode()).hexdigest()
+
+    def _load_cache(self):
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_file and os.path.exists(self.cache_file):
+                with open(self.cache_file, encoding="utf-8") as f:
+                    self._cache = json.load(f)
+        return self._cache
+
+    def _save_cache(self):
+        if self.cache_file:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+
+    # ----- requests -----
+    def search(self, params):
+        key = self.cache_key(params)
+
+        with self._lock:
+            entry = self._load_cache().get(key)
+            if entry and time.time() - entry["ts"] < self.ttl:
+                self.stats["hits"] += 1
+                return entry["data"]
+
+        params = {**params, "apiKey": params.get("apiKey", self.api_key)}
+        try:
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.stats["errors"] += 1
+            return {"error": "API Error", "details": str(e)}
+
+        if response.status_code != 200:
+            self.stats["errors"] += 1
+            return {"error": "API Error", "details": response.text}
+
+        data = response.json()
+        with self._lock:
+            self.stats["misses"] += 1
+            self._load_cache()[key] = {"ts": time.time(), "data": data}
+            self._save_cache()
+        return data
+
+    async def search_many(self, params_list, max_concurrency=5):
+        """Run several searches concurrently over the shared session pool."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def one(params):
+            async with semaphore:
+                return await asyncio.to_thread(self.search, params)
+
+        return await asyncio.gather(*(one(p) for p in params_list))
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+
+
+def get_client():
+    global _client
+    if _client is None:
+        _client = SpoonacularClient()
+    return _client
+
+
+# ================= PROFILE → PARAMS =================
 def build_api_params(master_file="master_health_ingredients.json"):
     safe, unsafe = filter_ingredients(master_file)
     params = {
         "apiKey": API_KEY,
         "includeIngredients": ",".join(safe),
         "excludeIngredients": ",".join([u["name"] for u in unsafe]),
+        # Return used/missed ingredients so results can be re-checked locally
+        "fillIngredients": True,
         "number": 5
     }
 
@@ -32,14 +156,78 @@ def build_api_params(master_file="master_health_ingredients.json"):
             params.update(CONDITION_TO_API[cond])
     return params
 
-def fetch_recipes(master_file="master_health_ingredients.json"):
+
+def fetch_recipes(master_file="master_health_ingredients.json", client=None):
     params = build_api_params(master_file)
-    response = requests.get(BASE_URL, params=params)
-    if response.status_code != 200:
-        return {"error": "API Error", "details": response.text}
-    return response.json()
+    return (client or get_client()).search(params)
+
+
+async def fetch_recipes_many(master_files, client=None, max_concurrency=5):
+    """Fetch recipes for several patient profiles concurrently."""
+    params_list = [build_api_params(m) for m in master_files]
+    return await (client or get_client()).search_many(params_list, max_concurrency)
+
+
+# ================= LOCAL STUB SERVER =================
+def start_stub_server(fail_first=0):
+    """Serve canned complexSearch results on localhost.
+
+    The first `fail_first` requests answer 503 to exercise retry/backoff.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.requests += 1
+            if self.server.requests <= fail_first:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            query = parse_qs(urlparse(self.path).query)
+            include = query.get("includeIngredients", [""])[0]
+            results = [{"id": i, "title": f"Stub recipe {i} ({include})"} for i in range(3)]
+            if query.get("fillIngredients", ["false"])[0].lower() == "true":
+                for r in results:
+                    r["usedIngredients"] = [{"name": n.strip()} for n in include.split(",") if n.strip()]
+                    r["missedIngredients"] = []
+            body = json.dumps({"results": results, "totalResults": 3}).encode()
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/recipes/complexSearch"
+
 
 # Quick test
 if __name__ == "__main__":
-    recipes = fetch_recipes()
-    print(recipes)
+    import sys
+
+    if "--stub" in sys.argv:
+        server, url = start_stub_server(fail_first=1)
+        stub = SpoonacularClient(base_url=url, cache_file=None, backoff=0.01)
+
+        first = stub.search({"includeIngredients": "Rice, milk", "number": 5})
+        again = stub.search({"includeIngredients": "milk,rice", "number": 5})
+        fanned = asyncio.run(stub.search_many(
+            [{"includeIngredients": f"item{i}"} for i in range(8)]
+        ))
+
+        print("✅ first:", first["results"][0]["title"])
+        print("✅ cached:", again == first, stub.stats)
+        print("✅ fan-out:", len(fanned), "responses,", server.requests, "HTTP requests")
+        server.shutdown()
+    else:
+        recipes = fetch_recipes()
+        print(recipes)
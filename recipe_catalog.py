@@ -0,0 +1,261 @@
+import json
+import os
+import numpy as np
+
+# ==========================================================
+# COLUMNAR, MEMORY-MAPPED RECIPE CATALOG
+# ==========================================================
+# data/processed_recipes.json → data/catalog/ (one .npy file per column)
+#
+#   meta.json                  row count, dictionaries, ingredient vocab
+#   course.npy / diet.npy ...  int16 dictionary codes
+#   prep_time.npy ...          int32, -1 = unknown
+#   calories.npy ...           float64, NaN = unknown
+#   diabetic_safe.npy ...      int8 dietary_profile flag, -1 = unknown
+#   name.offsets / name.data   UTF-8 string column (offsets + bytes)
+#   ingredients.indptr/.codes  CSR list column of ingredient vocab codes
+#
+# Columns are opened with np.load(mmap_mode="r") on first access, so a
+# filter on course/diet/times only touches the pages of those columns.
+
+CATALOG_JSON = "data/processed_recipes.json"
+CATALOG_DIR = "data/catalog"
+
+CATEGORY_COLUMNS = ["cuisine", "course", "diet"]
+INT_COLUMNS = ["prep_time", "cook_time"]
+NUTRITION_COLUMNS = ["calories", "protein_g", "fat_g", "carbs_g",
+                     "sugar_g", "sodium_mg", "potassium_mg", "coverage"]
+DIETARY_COLUMNS = ["vegan", "gluten_free", "diabetic_safe", "renal_safe"]
+STRING_COLUMNS = ["name", "instructions"]
+
+
+# ==========================================================
+# CONVERTER
+# ==========================================================
+
+def _save(out_dir, name, array):
+    np.save(os.path.join(out_dir, f"{name}.npy"), array, allow_pickle=False)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return -1
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def convert_json(json_file=CATALOG_JSON, out_dir=CATALOG_DIR):
+    """Write the JSON catalog as memory-mappable columns; returns row count."""
+    with open(json_file) as f:
+        recipes = json.load(f)
+
+    os.makedirs(out_dir, exist_ok=True)
+    n = len(recipes)
+    meta = {"rows": n, "dictionaries": {}}
+
+    for col in CATEGORY_COLUMNS:
+        values = [str(r.get(col) or "") for r in recipes]
+        vocab = sorted(set(values))
+        index = {v: i for i, v in enumerate(vocab)}
+        _save(out_dir, col, np.array([index[v] for v in values], dtype=np.int16))
+        meta["dictionaries"][col] = vocab
+
+    for col in INT_COLUMNS:
+        _save(out_dir, col, np.array([_to_int(r.get(col)) for r in recipes], dtype=np.int32))
+
+    for col in NUTRITION_COLUMNS:
+        values = [_to_float((r.get("nutrition") or {}).get(col)) for r in recipes]
+        _save(out_dir, col, np.array(values, dtype=np.float64))
+
+    for col in DIETARY_COLUMNS:
+        values = [(r.get("dietary_profile") or {}).get(col) for r in recipes]
+        _save(out_dir, col, np.array([-1 if v is None else int(v) for v in values], dtype=np.int8))
+
+    for col in STRING_COLUMNS:
+        encoded = [str(r.get(col) or "").encode("utf-8") for r in recipes]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(b) for b in encoded])
+        _save(out_dir, f"{col}.offsets", offsets)
+        _save(out_dir, f"{col}.data", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+    vocab_index = {}
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    codes = []
+    for i, r in enumerate(recipes):
+        for ing in r.get("ingredients", []):
+            codes.append(vocab_index.setdefault(ing, len(vocab_index)))
+        indptr[i + 1] = len(codes)
+    _save(out_dir, "ingredients.indptr", indptr)
+    _save(out_dir, "ingredients.codes", np.array(codes, dtype=np.int32))
+    meta["ingredient_vocab"] = list(vocab_index)
+
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return n
+
+
+def columns_dir(json_file):
+    """Column directory for a JSON catalog: data/catalog, or <stem>.catalog/."""
+    if os.path.abspath(json_file) == os.path.abspath(CATALOG_JSON):
+        return CATALOG_DIR
+    return os.path.splitext(json_file)[0] + ".catalog"
+
+
+def open_catalog(json_file=CATALOG_JSON, out_dir=None):
+    """ColumnarCatalog for a JSON catalog, converting it when missing or stale."""
+    out_dir = out_dir or columns_dir(json_file)
+    meta = os.path.join(out_dir, "meta.json")
+    if not os.path.exists(meta) or os.path.getmtime(meta) < os.path.getmtime(json_file):
+        convert_json(json_file, out_dir)
+    return ColumnarCatalog(out_dir)
+
+
+# ==========================================================
+# READER
+# ==========================================================
+
+class ColumnarCatalog:
+    """Lazy, memory-mapped view over a converted catalog directory."""
+
+    def __init__(self, path=CATALOG_DIR):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self._columns = {}
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def column(self, name):
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._columns[name]
+
+    @property
+    def ingredient_vocab(self):
+        return self.meta["ingredient_vocab"]
+
+    def code(self, column, value):
+        """Dictionary code of a category value, or -1 if it never occurs."""
+        try:
+            return self.meta["dictionaries"][column].index(value)
+        except ValueError:
+            return -1
+
+    # ----- filtering (no per-recipe dicts) -----
+    def mask(self, course=None, diet=None, cuisine=None,
+             max_prep_time=None, max_cook_time=None, max_total_time=None, **flags):
+        """Boolean row mask; unknown (-1) times never satisfy a time bound.
+
+        Extra keyword arguments filter dietary_profile flags, e.g.
+        ``mask(diabetic_safe=True)``.
+        """
+        keep = np.ones(len(self), dtype=bool)
+
+        for col, wanted in flags.items():
+            if col not in DIETARY_COLUMNS:
+                raise ValueError(f"Unknown dietary flag: {col}")
+            keep &= self.column(col) == int(wanted)
+
+        for col, wanted in (("course", course), ("diet", diet), ("cuisine", cuisine)):
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            codes = [self.code(col, w) for w in wanted]
+            keep &= np.isin(self.column(col), codes)
+
+        prep, cook = None, None
+        if max_prep_time is not None or max_total_time is not None:
+            prep = self.column("prep_time")
+        if max_cook_time is not None or max_total_time is not None:
+            cook = self.column("cook_time")
+
+        if max_prep_time is not None:
+            keep &= (prep >= 0) & (prep <= max_prep_time)
+        if max_cook_time is not None:
+            keep &= (cook >= 0) & (cook <= max_cook_time)
+        if max_total_time is not None:
+            keep &= (prep >= 0) & (cook >= 0) & (prep + cook <= max_total_time)
+        return keep
+
+    def filter(self, **criteria):
+        """Row indices matching `mask(**criteria)`."""
+        return np.flatnonzero(self.mask(**criteria))
+
+    # ----- materialization -----
+    def string(self, column, i):
+        offsets = self.column(f"{column}.offsets")
+        data = self.column(f"{column}.data")
+        return bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+    def names(self, rows):
+        return [self.string("name", int(i)) for i in rows]
+
+    def ingredient_codes(self, i):
+        indptr = self.column("ingredients.indptr")
+        return self.column("ingredients.codes")[indptr[i]:indptr[i + 1]]
+
+    def ingredients(self, i):
+        vocab = self.ingredient_vocab
+        return [vocab[c] for c in self.ingredient_codes(i)]
+
+    def record(self, i):
+        """Rebuild the processed_recipes.json dict for one row."""
+        i = int(i)
+        category = {
+            col: self.meta["dictionaries"][col][self.column(col)[i]] for col in CATEGORY_COLUMNS
+        }
+        nutrition = {}
+        for col in NUTRITION_COLUMNS:
+            value = float(self.column(col)[i])
+            if col in ("calories", "protein_g", "fat_g", "carbs_g") or not np.isnan(value):
+                nutrition[col] = None if np.isnan(value) else value
+
+        record = {
+            "name": self.string("name", i),
+            "cuisine": category["cuisine"],
+            "ingredients": self.ingredients(i),
+            "course": category["course"],
+            "diet": category["diet"],
+            "prep_time": int(self.column("prep_time")[i]),
+            "cook_time": int(self.column("cook_time")[i]),
+            "instructions": self.string("instructions", i),
+            "nutrition": nutrition,
+        }
+
+        flags = {col: int(self.column(col)[i]) for col in DIETARY_COLUMNS}
+        if any(v >= 0 for v in flags.values()):
+            record["dietary_profile"] = {col: bool(v) for col, v in flags.items() if v >= 0}
+        return record
+
+    def records(self, rows):
+        return [self.record(i) for i in rows]
+
+    def ingredient_matrix(self):
+        """Binary recipe × ingredient CSR matrix (requires scipy)."""
+        from scipy.sparse import csr_matrix
+
+        codes = self.column("ingredients.codes")
+        indptr = self.column("ingredients.indptr")
+        data = np.ones(len(codes), dtype=np.float32)
+        return csr_matrix((data, codes, indptr), shape=(len(self), len(self.ingredient_vocab)))
+
+
+if __name__ == "__main__":
+    import sys
+
+    src = sys.argv[1] if len(sys.argv) > 1 else CATALOG_JSON
+    dst = sys.argv[2] if len(sys.argv) > 2 else CATALOG_DIR
+    rows = convert_json(src, dst)
+    print(f"✅ Converted {rows} recipes to columnar catalog: {dst}/")
+
+    catalog = ColumnarCatalog(dst)
+    quick = catalog.filter(course="main course", diet="vegetarian", max_total_time=45)
+    print(f"🔎 {len(quick)} vegetarian main courses ready in 45 min, e.g. {catalog.names(quick[:3])}")
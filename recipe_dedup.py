@@ -0,0 +1,319 @@
+import hashlib
+import json
+from functools import lru_cache
+import numpy as np
+from recipe_retrieval import canonical_ingredient
+
+# ==========================================================
+# NEAR-DUPLICATE RECIPE DETECTION (MINHASH + LSH)
+# ==========================================================
+# Each recipe gets two MinHash signatures, one over its canonical
+# ingredient set and one over character shingles of its name. Every LSH
+# band takes a few rows of both, so only recipes similar in name AND
+# ingredients tend to share a bucket, which keeps the candidate pairs
+# roughly linear in the catalog size. Candidates are confirmed on the
+# exact Jaccard similarities; each cluster is a star around a complete
+# record, so A~B and B~C never chain A and C together, and every merged
+# record joins the centre it is most similar to.
+#
+#   recipes, report = dedup_recipes(recipes, sources)
+#   doc_id = recipe_id(recipe)      # stable, content-based
+
+NUM_PERM = 64            # hash functions per part (ingredients, name)
+BAND_ROWS = 3            # rows per part (ingredients + name) in each LSH band
+SHINGLE = 2              # name character shingle length
+PRIME = (1 << 31) - 1    # a * x + b stays inside int64 for a, x < 2^31
+CHUNK = 20_000           # recipes per signature block (bounds memory)
+MAX_BUCKET = 50          # larger LSH buckets are only paired with their first member
+
+# Match rule on exact Jaccard: each part must be close enough, and both
+# together closer still
+NAME_MIN = 0.5
+INGREDIENT_MIN = 0.5
+W_NAME = 0.5
+MATCH_THRESHOLD = 0.6
+ESTIMATE_SLACK = 0.15    # MinHash estimates only pre-filter; the exact check decides
+
+
+# ==========================================================
+# FEATURES & STABLE IDS
+# ==========================================================
+
+def normalize_name(name):
+    return " ".join("".join(ch if ch.isalnum() else " " for ch in str(name).lower()).split())
+
+
+def name_shingles(name, k=SHINGLE):
+    # Spaces are dropped so "Balu shahi" and "Balushahi" shingle the same
+    s = normalize_name(name).replace(" ", "")
+    if len(s) <= k:
+        return {s} if s else set()
+    return {s[i:i + k] for i in range(len(s) - k + 1)}
+
+
+# Raw ingredient strings repeat heavily across a catalog
+_canonical = lru_cache(maxsize=1 << 16)(canonical_ingredient)
+
+
+def ingredient_set(recipe):
+    return {c for c in (_canonical(i) for i in recipe.get("ingredients", [])) if c}
+
+
+def recipe_id(recipe):
+    """Firestore-safe id derived from the recipe's content, not its position.
+
+    The same dish (name + canonical ingredients) always gets the same id,
+    whichever source or run it came from.
+    """
+    name = normalize_name(recipe.get("name", ""))
+    content = json.dumps([name, sorted(ingredient_set(recipe))], separators=(",", ":"))
+    digest = hashlib.blake2b(content.encode("utf-8"), digest_size=5).hexdigest()
+    slug = name.replace(" ", "-")[:48].strip("-") or "recipe"
+    return f"{slug}-{digest}"
+
+
+def _token_hash(token):
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") % PRIME
+
+
+# ==========================================================
+# MINHASH
+# ==========================================================
+
+class MinHasher:
+    def __init__(self, num_perm=NUM_PERM, seed=0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, PRIME, num_perm, dtype=np.int64)
+        self.b = rng.integers(0, PRIME, num_perm, dtype=np.int64)
+        self.num_perm = num_perm
+
+    def signatures(self, token_sets):
+        """(len(token_sets), num_perm) int64 MinHash signatures.
+
+        Each distinct token is hashed once; per-recipe minima come from
+        np.minimum.reduceat over blocks of CHUNK recipes. Empty sets get a
+        unique out-of-range signature so they never match anything.
+        """
+        vocab = {}
+        codes = [[vocab.setdefault(t, len(vocab)) for t in tokens] for tokens in token_sets]
+        hashes = np.array([_token_hash(t) for t in vocab], dtype=np.int64)
+        permuted = (self.a[:, None] * hashes[None, :] + self.b[:, None]) % PRIME
+
+        out = np.empty((len(token_sets), self.num_perm), dtype=np.int64)
+        for start in range(0, len(codes), CHUNK):
+            block = codes[start:start + CHUNK]
+            sizes = np.array([len(c) for c in block])
+            filled = np.flatnonzero(sizes)
+            if len(filled):
+                flat = np.fromiter((i for c in block for i in c), dtype=np.int64, count=int(sizes.sum()))
+                offsets = np.concatenate(([0], np.cumsum(sizes[filled])[:-1]))
+                out[start + filled] = np.minimum.reduceat(permuted[:, flat], offsets, axis=1).T
+            empty = np.flatnonzero(sizes == 0)
+            out[start + empty] = (PRIME + start + empty)[:, None]
+        return out
+
+
+# ==========================================================
+# LSH CANDIDATES
+# ==========================================================
+
+def band_signatures(ing_sig, name_sig, rows=BAND_ROWS):
+    """Interleave both signatures so every band holds `rows` rows of each."""
+    bands = ing_sig.shape[1] // rows
+    n = len(ing_sig)
+    parts = [sig[:, :bands * rows].reshape(n, bands, rows) for sig in (ing_sig, name_sig)]
+    return np.concatenate(parts, axis=2).reshape(n, bands * 2 * rows)
+
+
+def lsh_candidates(signatures, rows=2 * BAND_ROWS):
+    """Unique (i, j) candidate pairs, i < j, from banded signature buckets."""
+    pairs = []
+    for start in range(0, signatures.shape[1] - rows + 1, rows):
+        band = np.ascontiguousarray(signatures[:, start:start + rows])
+        _, bucket, counts = np.unique(
+            band.view(np.dtype((np.void, band.dtype.itemsize * rows))).ravel(),
+            return_inverse=True, return_counts=True
+        )
+        members = np.flatnonzero(counts[bucket] > 1)
+        if not len(members):
+            continue
+        # Sorted by bucket, ascending row index inside each bucket
+        order = members[np.argsort(bucket[members], kind="stable")]
+        keys = bucket[order]
+        small = counts[keys] <= MAX_BUCKET
+
+        # Small buckets: all pairs, generated as "k positions apart" slices
+        for k in range(1, MAX_BUCKET):
+            same = (keys[:-k] == keys[k:]) & small[:-k]
+            if not same.any():
+                break
+            pairs.append(np.stack([order[:-k][same], order[k:][same]], axis=1))
+
+        # Large buckets: star around the first member only
+        first = np.searchsorted(keys, keys)
+        star = ~small & (first != np.arange(len(keys)))
+        if star.any():
+            pairs.append(np.stack([order[first[star]], order[star]], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs), axis=0)
+
+
+# ==========================================================
+# DEDUP + MERGE
+# ==========================================================
+
+def _richness(recipe):
+    """Prefer the most complete record as the one that is kept."""
+    filled = sum(1 for v in recipe.values() if v not in (None, "", [], {}, -1))
+    return (filled, len(recipe.get("instructions") or ""), len(recipe.get("ingredients") or []))
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _matches(name_sim, ing_sim, slack=0.0):
+    score = W_NAME * name_sim + (1 - W_NAME) * ing_sim
+    return (name_sim >= NAME_MIN - slack) & (ing_sim >= INGREDIENT_MIN - slack) & (score >= MATCH_THRESHOLD - slack)
+
+
+def find_duplicates(recipes, hasher=None):
+    """Confirmed near-duplicate pairs as (i, j, name_sim, ingredient_sim)."""
+    hasher = hasher or MinHasher()
+    ing_sets = [ingredient_set(r) for r in recipes]
+    name_sets = [name_shingles(r.get("name", "")) for r in recipes]
+    ing_sig = hasher.signatures(ing_sets)
+    name_sig = hasher.signatures(name_sets)
+
+    pairs = lsh_candidates(band_signatures(ing_sig, name_sig))
+    if not len(pairs):
+        return []
+
+    # Cheap estimates drop most candidates, exact Jaccard confirms the rest
+    i, j = pairs[:, 0], pairs[:, 1]
+    name_est = (name_sig[i] == name_sig[j]).mean(axis=1)
+    ing_est = (ing_sig[i] == ing_sig[j]).mean(axis=1)
+    close = _matches(name_est, ing_est, ESTIMATE_SLACK)
+
+    duplicates = []
+    for a, b in zip(i[close].tolist(), j[close].tolist()):
+        name_sim = jaccard(name_sets[a], name_sets[b])
+        ing_sim = jaccard(ing_sets[a], ing_sets[b])
+        if _matches(name_sim, ing_sim):
+            duplicates.append((a, b, name_sim, ing_sim))
+    return duplicates
+
+
+def dedup_recipes(recipes, sources=None):
+    """Collapse near-duplicates; returns (unique recipes, merge report).
+
+    `sources` optionally labels each input recipe (e.g. "indian_food.csv#12")
+    for the report. The kept record is the most complete one of its
+    cluster, with empty fields filled in from the others. Which record that
+    is can change between runs, so the report lists every member's
+    recipe_id (see superseded_ids).
+    """
+    sources = sources or [None] * len(recipes)
+
+    neighbours = {}
+    for i, j, name_sim, ing_sim in find_duplicates(recipes):
+        sim = {"name": round(name_sim, 3), "ingredients": round(ing_sim, 3)}
+        neighbours.setdefault(i, {})[j] = sim
+        neighbours.setdefault(j, {})[i] = sim
+
+    # Star clustering: centres are picked most complete first (in a
+    # content-determined order) among records no centre matches yet ...
+    order = sorted(neighbours, key=lambda m: (_richness(recipes[m]), recipe_id(recipes[m])), reverse=True)
+    centres, covered = set(), set()
+    for m in order:
+        if m not in covered:
+            centres.add(m)
+            covered.add(m)
+            covered.update(neighbours[m])
+
+    # ... then every other record joins the centre it is most similar to
+    def closeness(sim):
+        return W_NAME * sim["name"] + (1 - W_NAME) * sim["ingredients"]
+
+    clusters = {c: [] for c in centres}
+    center_of = {c: c for c in centres}
+    for m in order:
+        if m in centres:
+            continue
+        best = max((c for c in neighbours[m] if c in centres), key=lambda c: (closeness(neighbours[m][c]), -c))
+        clusters[best].append(m)
+        center_of[m] = best
+
+    unique, report = [], []
+    for i, recipe in enumerate(recipes):
+        if center_of.get(i, i) != i:
+            continue
+        members = clusters.get(i)
+        if not members:
+            unique.append(recipe)
+            continue
+
+        kept = dict(recipe)
+        for m in members:
+            for key, value in recipes[m].items():
+                if kept.get(key) in (None, "", [], {}, -1):
+                    kept[key] = value
+        unique.append(kept)
+
+        # Member ids are recorded so stores keyed by recipe_id can drop the
+        # documents of records that are now merged into another one
+        report.append({
+            "id": recipe_id(kept),
+            "kept": {"name": kept.get("name"), "source": sources[i], "id": recipe_id(recipe)},
+            "merged": [
+                {"name": recipes[m].get("name"), "source": sources[m], "id": recipe_id(recipes[m]),
+                 "similarity": neighbours[i][m]}
+                for m in members
+            ],
+        })
+    return unique, report
+
+
+def superseded_ids(report):
+    """recipe_ids from a merge report that no longer name a kept record."""
+    kept = {entry["id"] for entry in report}
+    ids = set()
+    for entry in report:
+        ids.add(entry["kept"]["id"])
+        ids.update(m["id"] for m in entry["merged"])
+    return ids - kept
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    files = sys.argv[1:] or ["data/processed_recipes.json"]
+    recipes, sources = [], []
+    for path in files:
+        with open(path) as f:
+            for i, r in enumerate(json.load(f)):
+                recipes.append(r)
+                sources.append(f"{path}#{i}")
+
+    if len(files) == 1:
+        # Demo: simulate a second source re-listing some dishes slightly differently
+        rng = random.Random(0)
+        for i in rng.sample(range(len(recipes)), min(25, len(recipes))):
+            copy = dict(recipes[i])
+            copy["name"] = copy["name"].upper().replace(" ", "")
+            copy["ingredients"] = copy["ingredients"][:-1] or copy["ingredients"]
+            recipes.append(copy)
+            sources.append(f"second_source#{i}")
+
+    start = time.perf_counter()
+    unique, report = dedup_recipes(recipes, sources)
+    elapsed = time.perf_counter() - start
+    print(f"🧬 {len(recipes)} recipes → {len(unique)} unique ({len(report)} merges) in {elapsed * 1000:.0f} ms")
+    for entry in report[:5]:
+        merged = ", ".join(f"{m['name']} [{m['source']}]" for m in entry["merged"])
+        print(f"🔗 {entry['id']}: kept {entry['kept']['name']} ← {merged}")
@@ -0,0 +1,213 @@
+import json
+import re
+from functools import lru_cache
+from typing import List
+from build_master_json import analyze_item_safety
+
+# ==========================================================
+# RETRIEVAL-FIRST RECIPE SUGGESTIONS
+# ==========================================================
+# Detected fridge ingredients are matched against the local catalog
+# (data/processed_recipes.json) and filtered by the medical profile.
+# The LLM is only asked for short annotations of the top-k matches.
+
+CATALOG_FILE = "data/processed_recipes.json"
+
+# Keywords that map free-text diagnoses onto the rule-engine condition keys
+CONDITION_KEYWORDS = {
+    "gerd": ["gerd", "reflux"],
+    "anxiety": ["anxiety", "panic"],
+    "diabetes": ["diabet"],
+    "renal": ["renal", "kidney", "ckd"],
+}
+
+
+# ==========================================================
+# NORMALIZATION
+# ==========================================================
+
+def canonical_ingredient(name):
+    """Lowercase, strip punctuation and singularize the head word."""
+    words = re.sub(r"[^a-z ]", " ", str(name).lower()).split()
+    if not words:
+        return ""
+    head = words[-1]
+    if head.endswith("oes"):
+        head = head[:-2]
+    elif head.endswith("s") and not head.endswith("ss") and len(head) > 3:
+        head = head[:-1]
+    words[-1] = head
+    return " ".join(words)
+
+
+def normalize_conditions(conditions):
+    keys = set()
+    for cond in conditions:
+        text = str(cond).lower()
+        keys.add(text)
+        for key, words in CONDITION_KEYWORDS.items():
+            if any(w in text for w in words):
+                keys.add(key)
+    return keys
+
+
+def profile_from_clinical(clinical):
+    """Return (conditions, allergies, medications) from either report shape.
+
+    Accepts the dashboard's short extraction ({"conditions", "medications"})
+    as well as the UniversalHealthReport layout from health_report_analyser.
+    """
+    clinical = clinical or {}
+
+    conditions = list(clinical.get("conditions") or [])
+    diagnoses = clinical.get("diagnoses") or {}
+    if isinstance(diagnoses, dict):
+        conditions += diagnoses.get("primary") or []
+        conditions += diagnoses.get("secondary") or []
+
+    allergies = clinical.get("allergies") or []
+    if isinstance(allergies, dict):
+        allergies = (allergies.get("food") or []) + (allergies.get("medications") or [])
+
+    medications = clinical.get("medications") or clinical.get("medications_current") or []
+
+    return normalize_conditions(conditions), [str(a) for a in allergies], [str(m) for m in medications]
+
+
+# ==========================================================
+# CATALOG INDEX
+# ==========================================================
+
+@lru_cache(maxsize=4)
+def load_catalog(path=CATALOG_FILE):
+    """Load the catalog once and precompute canonical ingredient sets.
+
+    Records are read from the columnar copy (recipe_catalog), which is
+    written by process_recipes and rebuilt here if it is older than `path`.
+    """
+    from recipe_catalog import open_catalog
+
+    try:
+        columns = open_catalog(path)
+        recipes = columns.records(range(len(columns)))
+    except OSError:
+        # Read-only checkout without converted columns
+        with open(path) as f:
+            recipes = json.load(f)
+
+    for recipe in recipes:
+        recipe["_canonical"] = [canonical_ingredient(i) for i in recipe.get("ingredients", [])]
+    return recipes
+
+
+def _is_available(ingredient, detected):
+    # "cherry tomato" is covered by a detected "tomato" (same head word)
+    return ingredient in detected or ingredient.rsplit(" ", 1)[-1] in detected
+
+
+def unsafe_checker(clinical):
+    """Memoized `ingredient -> True if the rule engine blocks it` for a patient."""
+    conditions, allergies, medications = profile_from_clinical(clinical)
+    unsafe_cache = {}
+
+    def is_unsafe(ingredient):
+        if ingredient not in unsafe_cache:
+            safe, _ = analyze_item_safety(conditions, allergies, medications, {"name": ingredient})
+            unsafe_cache[ingredient] = not safe
+        return unsafe_cache[ingredient]
+
+    return is_unsafe
+
+
+def retrieve_recipes(detected, clinical=None, k=5, path=CATALOG_FILE):
+    """Rank catalog recipes by how much of them the fridge already covers.
+
+    Recipes containing an ingredient the rule engine flags as unsafe for
+    the patient are dropped before ranking.
+    """
+    detected = {canonical_ingredient(d) for d in detected if d}
+    detected.discard("")
+    if not detected:
+        return []
+
+    is_unsafe = unsafe_checker(clinical)
+
+    scored = []
+    for recipe in load_catalog(path):
+        canon = [c for c in recipe["_canonical"] if c]
+        if not canon:
+            continue
+
+        matched = [c for c in canon if _is_available(c, detected)]
+        if not matched:
+            continue
+        if any(is_unsafe(c) for c in canon):
+            continue
+
+        coverage = len(matched) / len(canon)
+        scored.append((coverage, len(matched), recipe, matched))
+
+    scored.sort(key=lambda s: (s[0], s[1]), reverse=True)
+
+    results = []
+    for coverage, _, recipe, matched in scored[:k]:
+        results.append({
+            "name": recipe["name"],
+            "course": recipe.get("course"),
+            "diet": recipe.get("diet"),
+            "prep_time": recipe.get("prep_time"),
+            "cook_time": recipe.get("cook_time"),
+            "ingredients": recipe.get("ingredients", []),
+            "matched": matched,
+            "missing": [c for c in recipe["_canonical"] if c and c not in matched],
+            "score": round(coverage, 3),
+        })
+    return results
+
+
+# ==========================================================
+# LLM ANNOTATIONS (ONE BATCHED, SCHEMA-CONSTRAINED CALL)
+# ==========================================================
+
+ANNOTATION_PROMPT = """
+You are a medical nutritionist and chef. For EACH recipe below write one
+short medical_benefit and one short chef_tip (max 20 words each),
+tailored to the patient conditions. Keep recipe names unchanged.
+"""
+
+
+def annotate_recipes(client, model, recipes, clinical=None):
+    """Return {recipe name: RecipeNote} for all recipes in one call."""
+    if not recipes:
+        return {}
+
+    from llm_schemas import RecipeNote
+
+    conditions, _, _ = profile_from_clinical(clinical)
+    payload = {
+        "conditions": sorted(conditions),
+        "recipes": [{"name": r["name"], "ingredients": r["ingredients"]} for r in recipes],
+    }
+
+    response = client.call(
+        [ANNOTATION_PROMPT, json.dumps(payload, separators=(",", ":"))],
+        model=model,
+        stage="recipe_annotation",
+        config={
+            "temperature": 0.2,
+            "max_output_tokens": 80 * len(recipes) + 64,
+            "response_mime_type": "application/json",
+            "response_schema": List[RecipeNote],
+        },
+    )
+
+    notes = response.parsed or []
+    return {n.name: n for n in notes}
+
+
+if __name__ == "__main__":
+    with open("medical_report.json") as f:
+        report = json.load(f)
+
+    for r in retrieve_recipes(["rice", "moong dal", "ghee", "milk", "sugar"], report):
+        print(f"{r['score']:.2f}  {r['name']}  (missing: {', '.join(r['missing']) or '-'})")
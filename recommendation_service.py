@@ -0,0 +1,296 @@
+import asyncio
+import os
+import sys
+import time
+from aiohttp import web
+from build_master_json import build_master_data
+from constraint_engine import split_items
+from expiry_index import ExpiryIndex, RecipeIngredientIndex
+from llm_client import make_client
+from meal_planner import PlannerIndex, plan_week
+from recipe_retrieval import (
+    CATALOG_FILE, canonical_ingredient, load_catalog, profile_from_clinical, retrieve_recipes, unsafe_checker
+)
+from substitutions import SubstitutionIndex, get_index
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_assistant"))
+from kitchen_chatbot import answer_with_recipe
+
+# ==========================================================
+# LONG-RUNNING RECOMMENDATION SERVICE
+# ==========================================================
+# The catalog, rule-derived indexes and LLM clients are built once at
+# startup and shared by every request, instead of each script reloading
+# JSON and re-initializing clients per invocation.
+#
+#   python recommendation_service.py --port 8080
+#
+#   GET  /health
+#   POST /profile              {"medical_report": {...}, "ingredients": {"items": [...]}}
+#   POST /ingredients/filter   {"master": {...}} or the /profile body
+#   POST /recipes/recommend    {"clinical": {...}, "detected": [...], "fridge_items": [...], "k": 5}
+#   POST /plan                 {"clinical": {...}, "fridge_items": [...], "targets": {...}}
+#   POST /substitutions        {"clinical": {...}, "blocked": ["Milk", ...], "k": 3}
+#   POST /chat                 {"recipe_name": "...", "question": "..."}
+
+
+class ServiceState:
+    def __init__(self, catalog_file=CATALOG_FILE):
+        start = time.perf_counter()
+        self.catalog_file = catalog_file
+        self.catalog = load_catalog(catalog_file)
+        self.planner = PlannerIndex(self.catalog)
+        self.recipe_index = RecipeIngredientIndex(self.catalog)
+        # build_master_data uses the default-catalog index, so warm that one
+        self.substitutions = get_index() if catalog_file == CATALOG_FILE else SubstitutionIndex(self.catalog)
+        self.by_name = {r["name"].lower(): r for r in self.catalog}
+        self._chat_client = None
+        self.loaded_in = time.perf_counter() - start
+
+    @property
+    def chat_client(self):
+        # Created on first /chat so the service starts without an OpenAI key
+        if self._chat_client is None:
+            self._chat_client = make_client("openai", os.getenv("OPENAI_API_KEY"))
+        return self._chat_client
+
+
+STATE = web.AppKey("state", ServiceState)
+
+
+# ==========================================================
+# HANDLERS
+# ==========================================================
+
+class RequestError(Exception):
+    """Malformed request body; answered with a 400."""
+
+
+async def read_json(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        raise RequestError("body must be JSON")
+    if not isinstance(body, dict):
+        raise RequestError("body must be a JSON object")
+    return body
+
+
+KIND_NAMES = {dict: "JSON object", list: "list", str: "string"}
+
+
+def field(body, name, kind, default=None, required=False):
+    """body[name] checked against `kind`; missing or null gives `default`."""
+    value = body.get(name)
+    if value is None:
+        if required:
+            raise RequestError(f"'{name}' is required")
+        return default
+    if kind is int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise RequestError(f"'{name}' must be an integer")
+    if not isinstance(value, kind):
+        raise RequestError(f"'{name}' must be a {KIND_NAMES[kind]}")
+    return value
+
+
+def str_list(body, name, default=None, required=False):
+    """A list field whose elements must all be strings."""
+    value = field(body, name, list, default, required)
+    if value and not all(isinstance(v, str) for v in value):
+        raise RequestError(f"'{name}' must be a list of strings")
+    return value
+
+
+def top_k(body, default):
+    k = field(body, "k", int, default)
+    if k < 1:
+        raise RequestError("'k' must be at least 1")
+    return k
+
+
+def clinical_field(body, name="clinical"):
+    """A medical report in either shape accepted by profile_from_clinical."""
+    clinical = field(body, name, dict, {})
+    for key in ("conditions", "medications", "medications_current"):
+        str_list(clinical, key)
+    allergies = clinical.get("allergies")
+    if isinstance(allergies, dict):
+        for key in ("food", "medications"):
+            str_list(allergies, key)
+    elif allergies is not None:
+        str_list(clinical, "allergies")
+    diagnoses = field(clinical, "diagnoses", dict, {})
+    for key in ("primary", "secondary"):
+        str_list(diagnoses, key)
+    return clinical
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    # Only request validation is the client's fault; anything else is a
+    # bug in the service and stays a 500
+    try:
+        return await handler(request)
+    except RequestError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+
+async def health(request):
+    state = request.app[STATE]
+    return web.json_response({
+        "status": "ok",
+        "recipes": len(state.catalog),
+        "loaded_in_s": round(state.loaded_in, 3),
+    })
+
+
+def _items(body, name):
+    items = field(body, name, list, [])
+    if not all(isinstance(item, dict) and isinstance(item.get("name"), str) for item in items):
+        raise RequestError(f"'{name}' must be objects with a 'name'")
+    return items
+
+
+def _fridge_items(body):
+    return _items(body, "fridge_items")
+
+
+def _master_from_body(body):
+    # Same normalization as /plan and /recipes/recommend, so a
+    # UniversalHealthReport (diagnoses, medications_current, allergies by
+    # kind) gets the same verdicts on every endpoint
+    report = clinical_field(body, "medical_report")
+    conditions, allergies, medications = profile_from_clinical(report)
+    medical = {**report, "conditions": sorted(conditions), "allergies": allergies, "medications": medications}
+    ingredients = field(body, "ingredients", dict, {})
+    return build_master_data(medical, {**ingredients, "items": _items(ingredients, "items")})
+
+
+# The CPU-bound work below runs in worker threads (like the LLM call in
+# /chat) so one slow plan does not stall every other in-flight request
+
+async def profile(request):
+    body = await read_json(request)
+    return web.json_response(await asyncio.to_thread(_master_from_body, body))
+
+
+async def filter_ingredients(request):
+    body = await read_json(request)
+    master = field(body, "master", dict)
+    if master is None:
+        master = await asyncio.to_thread(_master_from_body, body)
+    items = (master.get("ingredients_profile") or {}).get("items")
+    if not isinstance(items, list) or not all(
+        isinstance(item, dict) and isinstance(item.get("name"), str)
+        and isinstance(item.get("is_safe_for_patient"), bool)
+        and (item["is_safe_for_patient"] or isinstance(item.get("reason"), str))
+        for item in items
+    ):
+        raise RequestError(
+            "'master' must contain ingredients_profile.items with name, is_safe_for_patient and reason"
+        )
+    safe, unsafe = split_items(items)
+    return web.json_response({"safe": safe, "unsafe": unsafe})
+
+
+def _recommend(state, detected, clinical, fridge_items, k):
+    result = {"matches": retrieve_recipes(detected, clinical, k=k, path=state.catalog_file)}
+    if fridge_items:
+        # Same patient filter as the matches: unsafe items never enter the
+        # expiry heap, and no suggested dish may contain an unsafe ingredient
+        is_unsafe = unsafe_checker(clinical)
+        usable = [item for item in fridge_items if not is_unsafe(canonical_ingredient(item["name"]))]
+        result["cook_tonight"] = ExpiryIndex(usable).what_to_cook(state.recipe_index, k=k, is_unsafe=is_unsafe)
+    return result
+
+
+async def recommend(request):
+    state = request.app[STATE]
+    body = await read_json(request)
+    clinical = clinical_field(body)
+    fridge_items = _fridge_items(body)
+    detected = str_list(body, "detected") or [item["name"] for item in fridge_items]
+    k = top_k(body, 5)
+
+    result = await asyncio.to_thread(_recommend, state, detected, clinical, fridge_items, k)
+    return web.json_response(result)
+
+
+def _targets(body):
+    targets = field(body, "targets", dict)
+    if targets and not all(isinstance(v, (int, float)) and not isinstance(v, bool) and v > 0
+                           for v in targets.values()):
+        raise RequestError("'targets' values must be positive numbers")
+    return targets
+
+
+async def plan(request):
+    state = request.app[STATE]
+    body = await read_json(request)
+    result = await asyncio.to_thread(
+        plan_week,
+        state.planner,
+        clinical_field(body),
+        _fridge_items(body),
+        _targets(body),
+    )
+    return web.json_response(result)
+
+
+async def substitutions(request):
+    state = request.app[STATE]
+    body = await read_json(request)
+    blocked = str_list(body, "blocked", required=True)
+    k = top_k(body, 3)
+    conditions, allergies, medications = profile_from_clinical(clinical_field(body))
+    suggestions = await asyncio.to_thread(
+        state.substitutions.suggest, blocked, conditions, allergies, medications, k=k
+    )
+    return web.json_response(suggestions)
+
+
+async def chat(request):
+    state = request.app[STATE]
+    body = await read_json(request)
+    recipe_name = field(body, "recipe_name", str, required=True)
+    question = field(body, "question", str, required=True)
+    recipe = state.by_name.get(recipe_name.lower())
+    if recipe is None:
+        return web.json_response({"error": f"Recipe '{recipe_name}' not found"}, status=404)
+
+    answer = await asyncio.to_thread(
+        answer_with_recipe, recipe["name"], recipe, question, state.chat_client
+    )
+    return web.json_response({"recipe": recipe["name"], "answer": answer})
+
+
+def create_app(catalog_file=CATALOG_FILE):
+    app = web.Application(middlewares=[error_middleware])
+    app[STATE] = ServiceState(catalog_file)
+    app.add_routes([
+        web.get("/health", health),
+        web.post("/profile", profile),
+        web.post("/ingredients/filter", filter_ingredients),
+        web.post("/recipes/recommend", recommend),
+        web.post("/plan", plan),
+        web.post("/substitutions", substitutions),
+        web.post("/chat", chat),
+    ])
+    return app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the recipe recommendation service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--catalog", default=CATALOG_FILE)
+    args = parser.parse_args()
+
+    app = create_app(args.catalog)
+    print(f"🚀 Warm state loaded in {app[STATE].loaded_in:.2f}s ({len(app[STATE].catalog)} recipes)")
+    web.run_app(app, host=args.host, port=args.port)
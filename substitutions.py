@@ -0,0 +1,249 @@
+import json
+import numpy as np
+from scipy.sparse import csr_matrix
+from build_master_json import analyze_item_safety
+from nutrition import NUTRIENTS, REFERENCE_FOODS, resolve_food
+from recipe_retrieval import CATALOG_FILE, canonical_ingredient
+
+# ==========================================================
+# LOCAL INGREDIENT SUBSTITUTION ENGINE
+# ==========================================================
+# Every catalog ingredient gets one unit vector built from
+#
+#   context   PPMI-weighted co-occurrence with the other ingredients
+#             (things cooked in the same dishes play similar roles)
+#   group     one-hot culinary group of its nutrition reference food
+#   nutrients standardized per-100 g profile of that reference food
+#
+# Substitutes for all blocked items of a profile are then one matrix
+# product (blocked × vocab cosine scores), masked by the patient's safe
+# set and reduced with argpartition.
+#
+#   index = get_index()
+#   index.suggest(["Milk", "Tomatoes"], conditions, allergies, medications)
+
+# Culinary role of each nutrition.REFERENCE_FOODS entry
+FOOD_GROUPS = {
+    "dairy": ["milk", "condensed milk", "milk solids", "cream", "yogurt", "coconut milk"],
+    "fat": ["ghee", "butter", "oil"],
+    "sweetener": ["sugar", "jaggery", "honey", "syrup"],
+    "grain": ["rice", "rice flake", "semolina", "bread"],
+    "flour": ["rice flour", "wheat flour", "gram flour", "millet flour"],
+    "pulse": ["pulse", "chickpea"],
+    "protein": ["paneer", "egg", "chicken", "red meat", "seafood"],
+    "vegetable": ["vegetable", "leafy green", "tomato", "onion", "mushroom", "potato", "sweet potato"],
+    "fruit": ["fruit", "dried fruit"],
+    "nut_seed": ["nut", "seed", "coconut"],
+    "flavour": ["aromatic", "spice", "souring", "soy sauce", "tomato sauce", "salt"],
+    "other": ["baking soda", "water"],
+}
+GROUP_OF = {food: group for group, foods in FOOD_GROUPS.items() for food in foods}
+GROUPS = list(FOOD_GROUPS)
+
+# Not vegetarian in the Indian sense; never offered for a vegetarian item
+NON_VEG_FOODS = {"egg", "chicken", "red meat", "seafood"}
+
+# Used when the catalog has no safe match for a blocked item of the group
+# (a milk allergy rules out the whole dairy family). Each entry is checked
+# against the profile through its base ingredient: (suggestion, base).
+GROUP_FALLBACKS = {
+    "dairy": [("almond milk", "almond"), ("oat milk", "oats"), ("soy milk", "soybean"),
+              ("coconut milk", "coconut")],
+    "protein": [("tofu", "soybean")],
+}
+
+# Feature block weights
+W_CONTEXT = 1.0
+W_GROUP = 1.0
+W_NUTRIENT = 0.5
+MIN_SCORE = 0.2             # weaker matches are not worth suggesting
+CROSS_GROUP_MIN_SCORE = 0.5  # a substitute from another group must be much closer
+
+
+def _unit_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+class SubstitutionIndex:
+    def __init__(self, recipes):
+        vocab = {}
+        indptr, indices = [0], []
+        for r in recipes:
+            row = {vocab.setdefault(c, len(vocab))
+                   for c in (canonical_ingredient(i) for i in r.get("ingredients", [])) if c}
+            indices.extend(sorted(row))
+            indptr.append(len(indices))
+        self.vocab = list(vocab)
+        self.vocab_index = vocab
+        incidence = csr_matrix(
+            (np.ones(len(indices)), indices, indptr), shape=(len(recipes), len(vocab))
+        )
+
+        self.foods = [resolve_food(term) for term in self.vocab]
+        self.groups = np.array([GROUPS.index(GROUP_OF[f]) if f else -1 for f in self.foods])
+        self.non_veg = np.array([f in NON_VEG_FOODS for f in self.foods], dtype=bool)
+        self.embeddings = _unit_rows(np.hstack([
+            W_CONTEXT * self._context_vectors(incidence),
+            W_GROUP * self._group_vectors(self.foods),
+            W_NUTRIENT * self._nutrient_vectors(self.foods),
+        ]))
+        self._safe_cache = {}
+
+    @classmethod
+    def from_file(cls, path=CATALOG_FILE):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    # ----- feature blocks -----
+    @staticmethod
+    def _context_vectors(incidence):
+        """Positive PMI of ingredient co-occurrence, one row per ingredient."""
+        cooc = (incidence.T @ incidence).toarray()
+        np.fill_diagonal(cooc, 0.0)
+        total = cooc.sum()
+        if total == 0:
+            return cooc
+        marginal = cooc.sum(axis=1)
+        expected = np.outer(marginal, marginal) / total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pmi = np.log(cooc / expected)
+        return _unit_rows(np.where(cooc > 0, np.maximum(pmi, 0.0), 0.0))
+
+    @staticmethod
+    def _group_vectors(foods):
+        onehot = np.zeros((len(foods), len(GROUPS)))
+        for i, food in enumerate(foods):
+            if food:
+                onehot[i, GROUPS.index(GROUP_OF[food])] = 1.0
+        return onehot
+
+    @staticmethod
+    def _nutrient_vectors(foods):
+        profile = np.array(
+            [REFERENCE_FOODS[f][0] if f else (0,) * len(NUTRIENTS) for f in foods], dtype=np.float64
+        ).reshape(len(foods), len(NUTRIENTS))
+        profile = np.log1p(profile)
+        known = np.array([f is not None for f in foods])
+        if known.any():
+            mean = profile[known].mean(axis=0)
+            std = profile[known].std(axis=0)
+            profile = np.where(known[:, None], (profile - mean) / np.where(std > 0, std, 1.0), 0.0)
+        return _unit_rows(profile)
+
+    # ----- per-patient safe set -----
+    def safe_mask(self, conditions, allergies, medications):
+        """True for vocab ingredients the rule engine allows; cached per profile."""
+        key = (tuple(sorted(conditions)), tuple(sorted(allergies)), tuple(sorted(medications)))
+        if key not in self._safe_cache:
+            self._safe_cache[key] = np.array([
+                analyze_item_safety(conditions, allergies, medications, {"name": term})[0]
+                for term in self.vocab
+            ])
+        return self._safe_cache[key]
+
+    def _fallbacks(self, group, conditions, allergies, medications, k):
+        options = GROUP_FALLBACKS.get(GROUPS[group], []) if group >= 0 else []
+        return [
+            {"name": name, "score": None} for name, base in options
+            if analyze_item_safety(conditions, allergies, medications, {"name": base})[0]
+        ][:k]
+
+    def _query_vector(self, name):
+        """Embedding row for a vocab ingredient, else one from its reference food alone."""
+        canon = canonical_ingredient(name)
+        idx = self.vocab_index.get(canon)
+        if idx is not None:
+            return self.embeddings[idx], idx, self.groups[idx]
+
+        food = resolve_food(canon)
+        if food is None:
+            return None, None, -1
+        # Not in the catalog (e.g. a fridge item): average the vocab rows
+        # that resolve to the same reference food
+        same = [i for i, f in enumerate(self.foods) if f == food]
+        if not same:
+            return None, None, GROUPS.index(GROUP_OF[food])
+        vector = self.embeddings[same].mean(axis=0)
+        return vector / (np.linalg.norm(vector) or 1.0), None, GROUPS.index(GROUP_OF[food])
+
+    # ----- search -----
+    def suggest(self, blocked, conditions=(), allergies=(), medications=(), k=3):
+        """{blocked item: [{"name", "score"}, ...]} of safe substitutes.
+
+        Candidates from the blocked item's own culinary group are preferred;
+        other groups are only used when the group has no safe match, and
+        GROUP_FALLBACKS when nothing in the catalog is safe. A vegetarian
+        item never gets a meat, fish or egg substitute.
+        """
+        queries = []
+        for name in dict.fromkeys(blocked):
+            vector, idx, group = self._query_vector(name)
+            if vector is not None:
+                queries.append((name, vector, idx, group))
+        result = {name: [] for name in dict.fromkeys(blocked)}
+        if not queries:
+            return result
+
+        safe = self.safe_mask(list(conditions), list(allergies), list(medications))
+        scores = np.stack([q[1] for q in queries]) @ self.embeddings.T
+        scores[:, ~safe] = -np.inf
+        veg = np.array([resolve_food(canonical_ingredient(q[0])) not in NON_VEG_FOODS for q in queries])
+        scores[veg[:, None] & self.non_veg[None, :]] = -np.inf
+        for row, (_, _, idx, _) in enumerate(queries):
+            if idx is not None:
+                scores[row, idx] = -np.inf
+
+        same_group = np.array([q[3] for q in queries])[:, None] == self.groups[None, :]
+        preferred = np.where(same_group, scores, -np.inf)
+        has_preferred = (preferred >= MIN_SCORE).any(axis=1)
+        fallback = np.where(scores >= CROSS_GROUP_MIN_SCORE, scores, -np.inf)
+        scores = np.where(has_preferred[:, None], preferred, fallback)
+
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        for row, (name, _, _, group) in enumerate(queries):
+            ranked = top[row][np.argsort(-scores[row, top[row]])]
+            result[name] = [
+                {"name": self.vocab[i], "score": round(float(scores[row, i]), 3)}
+                for i in ranked if scores[row, i] >= MIN_SCORE
+            ] or self._fallbacks(group, conditions, allergies, medications, k)
+        return result
+
+
+_index = None
+
+
+def get_index():
+    """Substitution index over the default catalog, built on first use."""
+    global _index
+    if _index is None:
+        _index = SubstitutionIndex.from_file()
+    return _index
+
+
+def substitute_notes(suggestions):
+    """Human-readable lines for the master JSON nutrition coach."""
+    notes = []
+    for item, subs in suggestions.items():
+        if subs:
+            names = [s["name"] for s in subs]
+            options = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} or {names[-1]}"
+            notes.append(f"Instead of {item}, try {options}")
+    return notes
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    index = get_index()
+    print(f"🧮 Index over {len(index.vocab)} ingredients built in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    blocked = ["Milk", "Tomatoes", "ghee", "sugar", "paneer", "wheat flour", "Coffee", "peanuts"]
+    start = time.perf_counter()
+    suggestions = index.suggest(blocked, ["gerd"], ["milk", "peanut"], ["Lorazepam"])
+    print(f"⚡ {len(blocked)} items in {(time.perf_counter() - start) * 1000:.2f} ms")
+    for item, subs in suggestions.items():
+        options = ", ".join(s["name"] if s["score"] is None else f"{s['name']} ({s['score']})" for s in subs)
+        print(f"🔁 {item}: {options or '-'}")
@@ -0,0 +1,100 @@
+import json
+import os
+from typing import List
+
+import pytest
+
+from llm_parsing import LLMParseError, loads_llm, parse_llm_json, repair_json, strip_fences
+from llm_schemas import RecipeNote, UniversalHealthReport
+
+REPORT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "medical_report.json")
+FULL = {"conditions": ["GERD"], "medications": ["Omeprazole"]}
+
+
+# ----- decoding without loss -----
+@pytest.mark.parametrize("text", [
+    json.dumps(FULL),
+    "```json\n" + json.dumps(FULL) + "\n```",
+    "Here is the JSON:\n```\n" + json.dumps(FULL) + "\n```\nDone.",
+    json.dumps(FULL) + "\nLet me know if you need more.",
+    json.dumps(FULL) + "\n```",
+    '{"conditions": ["GERD"], "medications": ["Omeprazole"],}',
+    '{"conditions": ["GERD",], "medications": ["Omeprazole"],}\nThanks!',
+    "Sure! " + json.dumps(FULL) + " Anything else?",
+])
+def test_complete_json_keeps_every_field(text):
+    assert loads_llm(text) == FULL
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1} trailing text', {"a": 1}),
+    ("[1, 2, 3] ok", [1, 2, 3]),
+    ('{"a": 1}\n```', {"a": 1}),
+    ('{"a": "x}", "b": [1]} and {"c": 2}', {"a": "x}", "b": [1]}),
+    ('{"quote": "say \\"hi\\"", "n": 1}', {"quote": 'say "hi"', "n": 1}),
+])
+def test_trailing_content_is_ignored(text, expected):
+    assert loads_llm(text) == expected
+
+
+# ----- truncated output -----
+@pytest.mark.parametrize("text, expected", [
+    ('{"ingredients": ["milk", "eggs", "spin', {"ingredients": ["milk", "eggs"]}),
+    ('{"identified_items": [{"item_name": "Milk", "confidence": "hi', {"identified_items": [{"item_name": "Milk"}]}),
+    ('[{"name": "Kheer", "chef_tip": "Use jaggery"}, {"name": "Po', [{"name": "Kheer", "chef_tip": "Use jaggery"}]),
+    ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1, 2]}),
+    ('{"a": 1, "b": {"c": true,', {"a": 1, "b": {"c": True}}),
+    ('{"a": 1, "long_k', {"a": 1}),
+    ('```json\n{"a": [1,\n```', {"a": [1]}),
+])
+def test_truncated_json_backs_off_to_last_complete_element(text, expected):
+    assert loads_llm(text) == expected
+
+
+def test_strip_fences():
+    assert strip_fences("```json\n[1]\n```") == "[1]"
+    assert strip_fences('Result: {"a": 1}') == '{"a": 1}'
+    assert strip_fences('{"a": 1}\n```') == '{"a": 1}'
+
+
+@pytest.mark.parametrize("text", ["", "   ", "no json here", "{:::}"])
+def test_unrepairable_input_raises(text):
+    with pytest.raises(LLMParseError) as err:
+        loads_llm(text)
+    assert err.value.raw == text
+
+
+def test_repair_json_does_not_cut_a_closed_root():
+    # The root is complete but invalid inside: failing is better than
+    # silently dropping the fields after the bad value
+    with pytest.raises(LLMParseError):
+        repair_json('{"a": 1, "b": nope, "c": 3}')
+
+
+# ----- validation -----
+def test_parse_llm_json_with_type_adapter_schema():
+    text = '```json\n[{"name": "Kheer", "medical_benefit": "calcium", "chef_tip": "jaggery"},]\n```'
+    notes = parse_llm_json(text, List[RecipeNote])
+    assert notes == [RecipeNote(name="Kheer", medical_benefit="calcium", chef_tip="jaggery")]
+
+
+@pytest.mark.parametrize("data, check", [
+    ({"allergies": {"unknown_reported": None}}, lambda r: r.allergies.unknown_reported is False),
+    ({"source_metadata": {"input_type": None}}, lambda r: r.source_metadata.input_type == "unknown"),
+    ({"encounter_info": {"report_type": None}}, lambda r: r.encounter_info.report_type == "unknown"),
+    ({"patient_profile": {"age": 45.5}}, lambda r: r.patient_profile.age == 45),
+    ({"patient_profile": {"age": "45 years", "gender": "F"}}, lambda r: (r.patient_profile.age, r.patient_profile.gender) == (45, "Female")),
+    ({"system_generated": {"confidence_score": "high"}}, lambda r: r.system_generated.confidence_score is None),
+    ({"system_generated": {"confidence_score": "0.8"}}, lambda r: r.system_generated.confidence_score == 0.8),
+    ({"diagnoses": ["GERD"]}, lambda r: r.diagnoses.primary == ["GERD"]),
+    ({"diagnoses": None, "symptoms": None}, lambda r: r.diagnoses.primary == [] and r.symptoms == []),
+    ({"lab_results": [{"test_name": "HbA1c", "value": "7.1%"}]}, lambda r: r.lab_results == ["HbA1c (value: 7.1%)"]),
+])
+def test_report_schema_coerces_prompt_style_nulls_and_drift(data, check):
+    assert check(parse_llm_json(json.dumps(data), UniversalHealthReport))
+
+
+def test_repo_medical_report_round_trips():
+    with open(REPORT) as f:
+        report = json.load(f)
+    assert UniversalHealthReport.model_validate(report).model_dump() == report
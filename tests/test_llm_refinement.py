@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+import pytest
+
+import llm_refinement
+from llm_client import FakeBackend, LLMClient
+from llm_refinement import filter_unsafe, refine_all, slim_recipe
+
+
+def _recipe(rid, title, *ingredients):
+    return {"id": rid, "title": title, "usedIngredients": [{"name": n} for n in ingredients]}
+
+
+def test_filter_unsafe_matches_whole_words():
+    recipes = [_recipe(1, "Jeera Rice", "rice", "cumin"), _recipe(2, "Egg Curry", "egg", "onion"),
+               _recipe(3, "Baingan Bharta", "eggplant")]
+    kept, removed = filter_unsafe(recipes, ["Ice", "Egg"])
+    assert [r["id"] for r in kept] == [1, 3]
+    assert removed == [{"recipe_id": "2", "title": "Egg Curry", "blocked": ["egg"]}]
+
+
+def test_recipes_without_ingredient_data_are_unverified():
+    kept, removed = filter_unsafe([{"id": 7, "title": "Mystery Bowl"}, _recipe(8, "Dal", "lentil")], ["milk"])
+    assert [r["id"] for r in kept] == [8]
+    assert removed == [{"recipe_id": "7", "title": "Mystery Bowl", "blocked": [], "reason": "no ingredient data"}]
+
+
+def _entry(rid):
+    return {"recipe_id": rid, "recipe_name": f"Recipe {rid}", "why_safe": "", "medical_benefit": "",
+            "serving_advice": "", "caution_note": ""}
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    def respond(contents):
+        sent = json.loads(contents[1])["recipes"]
+        # Echo every recipe, plus one id the batch never contained
+        return json.dumps([_entry(r["recipe_id"]) for r in sent] + [_entry("invented")])
+
+    client = LLMClient(FakeBackend(respond))
+    monkeypatch.setattr(llm_refinement, "_client", client)
+    return client
+
+
+def test_refine_all_drops_ids_outside_the_batch(fake_client):
+    pending = [slim_recipe(_recipe(i, f"Dish {i}", "rice")) for i in range(6)]
+    refined = asyncio.run(refine_all({"patient": {}}, pending))
+    assert sorted(r["recipe_id"] for r in refined) == [str(i) for i in range(6)]
@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+
+from nutrition import DEFAULT_SALT_G, REFERENCE_FOODS, compute_nutrition, enrich_recipes
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "processed_recipes.json")
+
+
+def _fresh(recipe):
+    """The catalog record without the fields enrich_recipes derives."""
+    return {**recipe, "nutrition": {k: None for k in recipe["nutrition"]}, "dietary_profile": None}
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    with open(CATALOG) as f:
+        recipes = [_fresh(r) for r in json.load(f)]
+    return {r["name"]: r for r in enrich_recipes(recipes)}
+
+
+def flags(recipe):
+    return recipe["dietary_profile"]
+
+
+@pytest.mark.parametrize("name", ["Sheera", "Sohan halwa", "Malapua", "Mohanthal", "Sheer korma"])
+def test_desserts_are_not_diabetic_safe(catalog, name):
+    assert not flags(catalog[name])["diabetic_safe"]
+
+
+@pytest.mark.parametrize("name", ["Bilahi Maas", "Konir Dom"])
+def test_non_vegetarian_recipes_are_not_vegan(catalog, name):
+    assert catalog[name]["diet"] == "non vegetarian"
+    assert not flags(catalog[name])["vegan"]
+
+
+def test_incomplete_coverage_is_never_diabetic_or_renal_safe(catalog):
+    incomplete = [r for r in catalog.values() if r["nutrition"]["coverage"] < 1]
+    assert incomplete
+    for recipe in incomplete:
+        assert not flags(recipe)["diabetic_safe"], recipe["name"]
+        assert not flags(recipe)["renal_safe"], recipe["name"]
+
+
+def test_no_dessert_is_diabetic_safe(catalog):
+    assert not [r["name"] for r in catalog.values() if r["course"] == "dessert" and flags(r)["diabetic_safe"]]
+
+
+def _recipe(ingredients, course="main course", diet="vegetarian"):
+    return {"name": "t", "course": course, "diet": diet, "ingredients": ingredients}
+
+
+def test_savoury_dish_without_listed_salt_gets_default_salt():
+    salt_sodium = DEFAULT_SALT_G * REFERENCE_FOODS["salt"][0][5] / 100.0
+    totals, _, _ = compute_nutrition([
+        _recipe(["rice", "onion"]),
+        _recipe(["rice", "onion"], course="dessert"),
+        _recipe(["rice", "onion", "salt"]),
+    ])
+    sodium = totals[:, 5]
+    assert sodium[0] == pytest.approx(sodium[1] + salt_sodium)
+    # A listed salt portion is not topped up
+    assert sodium[2] - sodium[1] == pytest.approx(REFERENCE_FOODS["salt"][0][5] * REFERENCE_FOODS["salt"][1] / 100.0)
+
+
+def test_flags_on_small_recipes():
+    _, f, coverage = compute_nutrition([
+        _recipe(["rice", "onion", "oil"]),
+        _recipe(["rice", "onion", "unobtainium"]),
+        _recipe(["rice", "onion", "oil"], diet="non vegetarian"),
+        _recipe(["rice", "ghee"]),
+    ])
+    assert coverage.tolist()[:2] == [1.0, pytest.approx(2 / 3)]
+    assert f["renal_safe"].tolist()[:2] == [True, False]
+    assert f["diabetic_safe"].tolist()[:2] == [True, False]
+    assert f["vegan"].tolist() == [True, True, False, False]
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+import pytest
+
+from recipe_api import SpoonacularClient, start_stub_server
+
+
+@pytest.fixture
+def stub():
+    """Factory for (server, client) pairs against the local stub server."""
+    servers = []
+
+    def make(fail_first=0, retries=3, **client_kwargs):
+        server, url = start_stub_server(fail_first=fail_first)
+        servers.append(server)
+        client_kwargs.setdefault("cache_file", None)
+        client = SpoonacularClient(api_key="test-key", base_url=url, retries=retries, backoff=0,
+                                   **client_kwargs)
+        return server, client
+
+    yield make
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_retries_503_then_succeeds(stub):
+    server, client = stub(fail_first=2)
+
+    data = client.search({"includeIngredients": "rice"})
+
+    assert data["totalResults"] == 3
+    assert server.requests == 3           # two 503s + the successful retry
+    assert client.stats == {"hits": 0, "misses": 1, "errors": 0}
+
+
+def test_gives_up_after_retry_budget(stub):
+    server, client = stub(fail_first=10, retries=2)
+
+    data = client.search({"includeIngredients": "rice"})
+
+    assert data["error"] == "API Error"
+    assert server.requests == 3           # first try + 2 retries
+    assert client.stats["errors"] == 1
+
+
+def test_cache_hit_for_reordered_and_recased_params(stub):
+    server, client = stub()
+
+    first = client.search({"includeIngredients": "Rice, milk", "number": 5})
+    again = client.search({"number": 5, "includeIngredients": "milk,RICE"})
+
+    assert again == first
+    assert server.requests == 1
+    assert client.stats["hits"] == 1
+
+
+def test_different_params_miss(stub):
+    server, client = stub()
+
+    client.search({"includeIngredients": "rice"})
+    client.search({"includeIngredients": "rice", "number": 10})
+
+    assert server.requests == 2
+    assert client.stats["misses"] == 2
+
+
+def test_ttl_expiry_refetches(stub):
+    server, client = stub(ttl=60)
+    params = {"includeIngredients": "rice"}
+
+    client.search(params)
+    client.search(params)
+    assert server.requests == 1
+
+    # Age the entry past the TTL
+    client._cache[client.cache_key(params)]["ts"] -= 61
+    client.search(params)
+
+    assert server.requests == 2
+    assert client.stats == {"hits": 1, "misses": 2, "errors": 0}
+
+
+def test_api_key_not_part_of_cache_key(stub, tmp_path):
+    params = {"includeIngredients": "rice", "number": 5}
+    assert (SpoonacularClient.cache_key({**params, "apiKey": "one"})
+            == SpoonacularClient.cache_key({**params, "apiKey": "two"})
+            == SpoonacularClient.cache_key(params))
+
+    cache_file = tmp_path / "cache.json"
+    server, client = stub(cache_file=str(cache_file))
+    client.search({**params, "apiKey": "secret-key"})
+
+    assert "secret-key" not in cache_file.read_text()
+    assert "test-key" not in cache_file.read_text()
+
+
+def test_persistent_cache_survives_new_client(stub, tmp_path):
+    cache_file = str(tmp_path / "cache.json")
+    server, client = stub(cache_file=cache_file)
+    client.search({"includeIngredients": "rice"})
+
+    fresh = SpoonacularClient(base_url="http://127.0.0.1:9/unused", cache_file=cache_file)
+    assert fresh.search({"includeIngredients": "RICE"})["totalResults"] == 3
+    assert fresh.stats["hits"] == 1
+    assert len(json.loads(open(cache_file).read())) == 1
+
+
+def test_fan_out_issues_one_request_per_distinct_query(stub):
+    server, client = stub()
+    params_list = [{"includeIngredients": f"item{i}"} for i in range(8)]
+
+    results = asyncio.run(client.search_many(params_list, max_concurrency=4))
+
+    assert [r["results"][0]["title"] for r in results] == [
+        f"Stub recipe 0 (item{i})" for i in range(8)
+    ]
+    assert server.requests == 8
+    assert client.stats["misses"] == 8
+
+    asyncio.run(client.search_many(params_list))
+    assert server.requests == 8
+    assert client.stats["hits"] == 8
@@ -0,0 +1,42 @@
+import json
+import os
+
+from recipe_catalog import ColumnarCatalog, columns_dir, convert_json, open_catalog
+from recipe_retrieval import load_catalog
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "processed_recipes.json")
+
+
+def _small_catalog(tmp_path, recipes):
+    json_file = tmp_path / "recipes.json"
+    json_file.write_text(json.dumps(recipes))
+    return str(json_file)
+
+
+def test_records_round_trip_the_json_catalog(tmp_path):
+    with open(CATALOG) as f:
+        recipes = json.load(f)
+    convert_json(CATALOG, str(tmp_path / "catalog"))
+    catalog = ColumnarCatalog(str(tmp_path / "catalog"))
+    assert catalog.records(range(len(catalog))) == recipes
+
+
+def test_open_catalog_reconverts_stale_columns(tmp_path):
+    recipe = {"name": "Dal", "ingredients": ["lentil"], "prep_time": 5, "cook_time": 20}
+    json_file = _small_catalog(tmp_path, [recipe])
+    assert len(open_catalog(json_file)) == 1
+    assert os.path.isdir(columns_dir(json_file))
+
+    with open(json_file, "w") as f:
+        json.dump([recipe, {**recipe, "name": "Khichdi"}], f)
+    meta = os.path.join(columns_dir(json_file), "meta.json")
+    os.utime(meta, (0, 0))
+    assert open_catalog(json_file).names([0, 1]) == ["Dal", "Khichdi"]
+
+
+def test_load_catalog_reads_through_columns(tmp_path):
+    json_file = _small_catalog(tmp_path, [{"name": "Aloo Gobi", "ingredients": ["Potatoes", "cauliflower"]}])
+    recipes = load_catalog(json_file)
+    assert os.path.exists(os.path.join(columns_dir(json_file), "meta.json"))
+    assert recipes[0]["name"] == "Aloo Gobi"
+    assert recipes[0]["_canonical"] == ["potato", "cauliflower"]
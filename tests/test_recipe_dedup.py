@@ -0,0 +1,36 @@
+from recipe_dedup import dedup_recipes, recipe_id, superseded_ids
+
+PALAK = {"name": "Palak Paneer", "ingredients": ["spinach", "paneer", "cream", "garlic", "ginger"],
+         "course": "main course", "diet": "vegetarian", "prep_time": -1, "cook_time": 30, "instructions": ""}
+
+
+def test_merged_duplicates_collapse_to_one_record():
+    copy = {**PALAK, "name": "PALAK PANEER", "prep_time": 10}
+    unique, report = dedup_recipes([PALAK, copy], ["a.csv#0", "b.csv#0"])
+    assert len(unique) == 1 and len(report) == 1
+    assert unique[0]["cook_time"] == 30 and unique[0]["prep_time"] == 10
+    assert report[0]["id"] == recipe_id(unique[0])
+
+
+def test_report_names_the_ids_a_new_run_supersedes():
+    # Run 1: only the sparse record and a copy with a shorter ingredient list
+    first = {**PALAK, "ingredients": PALAK["ingredients"][:-1]}
+    unique_1, _ = dedup_recipes([PALAK, first])
+    old_id = recipe_id(unique_1[0])
+
+    # Run 2: a richer listing from a new source becomes the kept record
+    richer = {**first, "name": "Palak paneer", "prep_time": 15, "instructions": "Blanch, blend, simmer."}
+    unique_2, report = dedup_recipes([PALAK, first, richer])
+    assert len(unique_2) == 1
+    new_id = recipe_id(unique_2[0])
+    assert new_id != old_id
+
+    stale = superseded_ids(report)
+    assert old_id in stale and new_id not in stale
+    assert all("id" in m for m in report[0]["merged"])
+
+
+def test_unrelated_recipes_are_kept_apart():
+    dal = {"name": "Dal Tadka", "ingredients": ["toor dal", "ghee", "cumin", "garlic"]}
+    unique, report = dedup_recipes([PALAK, dal])
+    assert len(unique) == 2 and report == []
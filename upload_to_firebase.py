@@ -1,5 +1,23 @@
 from firebase_connect import db  # your firebase setup file
 import json
+import os
+from process_recipes import MERGE_REPORT_FILE
+from recipe_dedup import recipe_id, superseded_ids
+
+# Document ids come from recipe_id(): a name slug plus a hash of the exact
+# normalized name and canonical ingredients. Re-uploading the same record
+# overwrites its document; near-duplicates from other sources are merged
+# by process_recipes (dedup_recipes) before they get here, so the id is
+# that of whichever record was kept for the dish. That can change when a
+# source is added, so every merged member's id from the merge report is
+# deleted, leaving one document per dish.
+#
+# Migration: documents used to be keyed by name.replace(" ", "_").lower().
+# That legacy document is deleted when its recipe is uploaded under the
+# new id, so no orphaned name-keyed copies are left behind.
+
+def legacy_id(recipe):
+    return recipe["name"].replace(" ", "_").lower()
 
 # Load processed recipes
 with open("data/processed_recipes.json") as f:
@@ -7,8 +25,28 @@ with open("data/processed_recipes.json") as f:
 
 collection = db.collection("recipes")
 
+migrated = 0
 for recipe in recipes[:500]:  # Limit for testing
-    doc_id = recipe["name"].replace(" ", "_").lower()
+    doc_id = recipe_id(recipe)
     collection.document(doc_id).set(recipe)
 
-print("✅ Recipes uploaded to Firebase Firestore!")
+    old = collection.document(legacy_id(recipe))
+    if old.id != doc_id and old.get().exists:
+        old.delete()
+        migrated += 1
+
+# Drop documents of records that are now merged into another one
+removed = 0
+if os.path.exists(MERGE_REPORT_FILE):
+    with open(MERGE_REPORT_FILE) as f:
+        stale = superseded_ids(json.load(f)) - {recipe_id(r) for r in recipes}
+    for doc_id in sorted(stale):
+        doc = collection.document(doc_id)
+        if doc.get().exists:
+            doc.delete()
+            removed += 1
+else:
+    print(f"⚠️ No merge report at {MERGE_REPORT_FILE}; merged duplicates were not cleaned up")
+
+print(f"✅ Recipes uploaded to Firebase Firestore! ({migrated} legacy name-keyed docs migrated, "
+      f"{removed} merged duplicates removed)")
@@ -1,14 +1,16 @@
 import streamlit as st
-from google import genai
-from PIL import Image
+from app_cache import begin_rerun, cached_client, render_cache_panel, render_llm_panel
+from llm_parsing import loads_llm
 import json
 import os
 
 # =======================
 # 🔐 GEMINI API
 # =======================
+begin_rerun()
+
 API_KEY = st.secrets["GEMINI_API_KEY"]  # or "YOUR_KEY_HERE"
-client = genai.Client(api_key=API_KEY)
+client = cached_client(API_KEY)
 
 MODEL_ID = "gemini-2.5-flash"
 
@@ -42,6 +44,7 @@ else:
     image_source = st.file_uploader("📁 Upload fridge image", type=["jpg", "jpeg", "png"])
 
 if image_source:
+    from PIL import Image
     image = Image.open(image_source)
     st.image(image, caption="🖼️ Image Preview", use_column_width=True)
 
@@ -75,14 +78,14 @@ Analyze this image and list all visible ingredients.
 }
 """
 
-        response = client.models.generate_content(
+        response = client.call(
+            [prompt, image],
             model=MODEL_ID,
-            contents=[prompt, image]
+            stage="fridge_scan"
         )
 
         try:
-            cleaned = response.text.replace("```json","").replace("```","").strip()
-            parsed = json.loads(cleaned)
+            parsed = loads_llm(response.text)
 
             st.success("🎉 Ingredients Identified")
             st.json(parsed)
@@ -100,3 +103,6 @@ Analyze this image and list all visible ingredients.
             st.error("❌ JSON Parsing Failed")
             st.code(response.text)
             st.exception(e)
+
+render_cache_panel()
+render_llm_panel()